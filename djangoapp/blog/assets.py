@@ -0,0 +1,29 @@
+from functools import lru_cache
+
+from django.contrib.staticfiles import finders
+
+# Arquivos do CodeMirror usados no post.html, na ordem de carregamento
+# (o htmlmixed usa os modos xml, javascript e css).
+CODEMIRROR_VERSION = '5.62.2'
+CODEMIRROR_CDN = f'https://cdnjs.cloudflare.com/ajax/libs/codemirror/{CODEMIRROR_VERSION}/'
+CODEMIRROR_FILES = (
+    'codemirror.min.js',
+    'mode/xml/xml.min.js',
+    'mode/javascript/javascript.min.js',
+    'mode/css/css.min.js',
+    'mode/htmlmixed/htmlmixed.min.js',
+    'mode/python/python.min.js',
+)
+
+# Gerado pelo comando build_codemirror (scripts/collectstatic.sh)
+CODEMIRROR_BUNDLE = f'blog/vendor/codemirror-{CODEMIRROR_VERSION}.bundle.js'
+
+
+def codemirror_cdn_urls():
+    return [CODEMIRROR_CDN + path for path in CODEMIRROR_FILES]
+
+
+@lru_cache(maxsize=None)
+def bundle_available(name):
+    # Verificado uma vez por processo: o bundle só muda no deploy
+    return finders.find(name) is not None
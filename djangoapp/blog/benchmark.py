@@ -0,0 +1,194 @@
+import importlib.util
+import platform
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import urls as blog_urls
+from blog.models import Category, Page, Post, Tag
+
+# Benchmark das rotas públicas (comando benchmark). Gere os dados antes com seed_blog.
+LOADTEST = settings.BASE_DIR.parent / 'scripts' / 'loadtest.py'
+
+# Termo buscado na rota de busca (aparece no conteúdo do seed_blog)
+SEARCH_TERM = 'django'
+
+# Baseline versionado: só as queries por rota (não dependem da máquina). Para
+# comparar também latência/req/s, grave um baseline na própria máquina de CI
+# com --save-baseline (ver scripts/benchmark.sh).
+BASELINE = settings.BASE_DIR / 'blog' / 'benchmark_baseline.json'
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def route_urls():
+    """
+    Uma URL de exemplo para cada rota de blog/urls.py (mais a 2ª página da
+    home). Rota nova sem exemplo aqui é erro: o benchmark cobre todas.
+    """
+    published = Post.objManager.get_published()
+    post = published.only('slug').first()
+    page = Page.objects.filter(is_published=True).only('slug').first()
+    category = Category.objects.filter(post__is_published=True).only('slug').first()
+    tag = Tag.objects.filter(post__is_published=True).only('slug').first()
+    author_pk = published.exclude(created_by=None).values_list('created_by', flat=True).first()
+    if None in (post, page, category, tag, author_pk):
+        raise BenchmarkError('Sem dados para todas as rotas: rode o comando seed_blog antes')
+
+    urls = {
+        'index': reverse('blog:index'),
+        'index:page-2': reverse('blog:index') + '?page=2',
+        'post': reverse('blog:post', args=(post.slug,)),
+        'page': reverse('blog:page', args=(page.slug,)),
+        'created_by': reverse('blog:created_by', args=(author_pk,)),
+        'category': reverse('blog:category', args=(category.slug,)),
+        'tag': reverse('blog:tag', args=(tag.slug,)),
+        'search': reverse('blog:search') + f'?search={SEARCH_TERM}',
+    }
+    missing = {pattern.name for pattern in blog_urls.urlpatterns} - set(urls)
+    if missing:
+        raise BenchmarkError(f'Rotas sem URL de exemplo no benchmark: {sorted(missing)}')
+    return urls
+
+
+def summarize(latencies, errors=0):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {'requests': 0, 'errors': errors, 'rps': 0.0}
+
+    def percentile(value):
+        return latencies[min(int(len(latencies) * value), len(latencies) - 1)] * 1000
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / sum(latencies),
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+    }
+
+
+def run_client(urls, iterations=50, warmup=3, cold=False):
+    """
+    Mede cada rota pelo test client, no próprio processo (sem rede): latência
+    e queries por requisição. cold=True limpa o cache antes de cada requisição.
+    """
+    client = Client()
+    results = {}
+    # O test client usa o host 'testserver' (fora dos testes não está no ALLOWED_HOSTS)
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name, url in urls.items():
+            for _ in range(warmup):
+                client.get(url)
+
+            latencies, queries = [], []
+            for _ in range(iterations):
+                if cold:
+                    cache.clear()
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise BenchmarkError(f'{url} respondeu {response.status_code}')
+                queries.append(len(captured))
+
+            results[name] = {'url': url, **summarize(latencies), 'queries': max(queries)}
+    return results
+
+
+def load_loadtest():
+    # scripts/loadtest.py não é um pacote: carregamos o arquivo direto
+    spec = importlib.util.spec_from_file_location('loadtest', LOADTEST)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_server(urls, base_url=None, workers=None, concurrency=8, duration=5, port=8765):
+    """
+    Mede cada rota contra um servidor de verdade, com vários clientes em
+    paralelo (scripts/loadtest.py). Com workers, sobe um gunicorn próprio.
+    """
+    loadtest = load_loadtest()
+    server = None
+    if workers:
+        base_url = f'http://127.0.0.1:{port}'
+        server = loadtest.start_gunicorn(
+            workers, port, str(settings.BASE_DIR), 'project.wsgi:application',
+        )
+        if not loadtest.wait_ready(base_url):
+            server.terminate()
+            raise BenchmarkError(f'gunicorn com {workers} worker(s) não respondeu')
+
+    try:
+        results = {}
+        for name, url in urls.items():
+            loadtest.run(base_url, [url], concurrency, 1)  # Aquecimento
+            results[name] = {'url': url, **loadtest.run(base_url, [url], concurrency, duration)}
+        return results
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def report_meta(**options):
+    return {
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'posts': Post.objManager.count(),
+        **options,
+    }
+
+
+def queries_only(report):
+    # O que vai para o baseline versionado: as mesmas em qualquer máquina
+    return {
+        'client': {
+            name: {'url': result['url'], 'queries': result['queries']}
+            for name, result in report['client'].items()
+        },
+    }
+
+
+def compare(current, baseline, tolerance=0.25):
+    """
+    Regressões em relação ao baseline: mais queries (sempre), p50 e
+    req/s piores que a tolerância e p99 pior que o dobro dela (mais ruidoso).
+    Rotas do baseline sem tempos (só queries) comparam só as queries.
+    """
+    problems = []
+    for mode in ('client', 'server'):
+        for name, base in baseline.get(mode, {}).items():
+            label = f'{mode} {name}'
+            result = current.get(mode, {}).get(name)
+            if not result:
+                if mode in current:
+                    problems.append(f'{label}: rota não medida')
+                continue
+            if result.get('queries', 0) > base.get('queries', float('inf')):
+                problems.append(f'{label}: {result["queries"]} queries (baseline {base["queries"]})')
+            if not result.get('requests') or not base.get('requests'):
+                continue
+            for metric, limit in (('p50_ms', tolerance), ('p99_ms', tolerance * 2)):
+                if result[metric] > base[metric] * (1 + limit):
+                    problems.append(
+                        f'{label}: {metric} {result[metric]:.1f} (baseline {base[metric]:.1f})'
+                    )
+            if result['rps'] < base['rps'] * (1 - tolerance):
+                problems.append(f'{label}: {result["rps"]:.1f} req/s (baseline {base["rps"]:.1f})')
+    return problems
@@ -0,0 +1,163 @@
+import hashlib
+import math
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from project.compression import encode_variants
+from project.metrics import cache_accessed
+from project.routers import get_replicas
+
+# Tempo padrão (segundos) das páginas e fragmentos em cache
+DEFAULT_TIMEOUT = 300
+
+# Headers da resposta que guardamos junto com o HTML
+CACHED_HEADERS = ('Content-Type', 'Content-Language', 'ETag', 'Last-Modified')
+
+
+def page_cache_timeout(generations=None):
+    timeout = getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+    return fill_timeout(timeout, generations)
+
+
+def fill_timeout(timeout, generations=None):
+    """
+    Tempo de cache de algo lido agora das réplicas. Logo depois de uma troca
+    de geração (até REPLICA_STICKY_SECONDS) uma réplica atrasada ainda pode
+    devolver as linhas antigas: o valor fica só até o fim dessa janela.
+    """
+    if not generations or not get_replicas():
+        return timeout
+    window = getattr(settings, 'REPLICA_STICKY_SECONDS', 15)
+    remaining = window - (time.time_ns() - max(generations)) / 1e9
+    if remaining <= 0:
+        return timeout
+    return min(timeout, math.ceil(remaining))
+
+
+# Gerações: cada namespace ('site', 'lists', 'post:<slug>', 'page:<slug>') tem um
+# valor que entra na chave das páginas. Invalidar = trocar o valor, e as chaves
+# antigas simplesmente deixam de ser lidas (e expiram sozinhas).
+def _generation_key(namespace):
+    return f'blog:gen:{namespace}'
+
+
+def get_generations(namespaces):
+    keys = [_generation_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Outro processo pode ter criado a geração antes: vale a dele
+            generation = time.time_ns()
+            if not cache.add(key, generation, None):
+                generation = cache.get(key, generation)
+            found[key] = generation
+    return [found[key] for key in keys]
+
+
+def generation_time(generations):
+    # As gerações são time.time_ns() do momento em que foram trocadas
+    return datetime.fromtimestamp(max(generations) / 1e9, tz=timezone.utc)
+
+
+def invalidate(*namespaces):
+    cache.set_many(
+        {_generation_key(namespace): time.time_ns() for namespace in namespaces},
+        None,
+    )
+
+
+def invalidate_post_card(*pks):
+    cache.delete_many([make_template_fragment_key('post_card', [pk]) for pk in pks])
+
+
+def page_cache_key(request, generations):
+    generations = ':'.join(str(gen) for gen in generations)
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:page:{url}:{hashlib.md5(generations.encode()).hexdigest()}'
+
+
+def is_cacheable_request(request):
+    # Só visitantes anônimos: usuários logados podem ver conteúdo diferente
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+    )
+
+
+def is_cacheable_response(response):
+    return response.status_code == 200 and not response.cookies
+
+
+class CachedPageMixin:
+    """
+    Guarda o HTML renderizado das views públicas para visitantes anônimos.
+
+    A chave é a URL completa (com ?page=) mais as gerações dos namespaces
+    retornados por get_cache_namespaces(); os signals do blog trocam as
+    gerações quando algo é salvo no admin.
+    """
+
+    def get_cache_namespaces(self):
+        return ['site']
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        generations = get_generations(self.get_cache_namespaces())
+        key = page_cache_key(request, generations)
+        cached = cache.get(key)
+        cache_accessed.send(sender=CachedPageMixin, name='page', hit=cached is not None)
+        if cached is not None:
+            return self.response_from_cache(cached)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if not is_cacheable_response(response):
+            return response
+
+        def store(response):
+            entry = self.cache_entry(response)
+            cache.set(key, entry, page_cache_timeout(generations))
+            response.encoded_variants = entry['encoded']  # Já comprimido, usado pelo middleware
+
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+
+    # O HTML vai para o cache também comprimido (br/gzip), e o
+    # project.compression.CompressionMiddleware usa essas versões direto
+    def cache_entry(self, response):
+        return {
+            'content': response.content,
+            'encoded': encode_variants(response.content),
+            'headers': {
+                header: response[header]
+                for header in CACHED_HEADERS if response.has_header(header)
+            },
+        }
+
+    def response_from_cache(self, entry):
+        # ETag/Last-Modified guardados permitem responder 304 sem tocar no banco
+        headers = entry['headers']
+        not_modified = get_conditional_response(
+            self.request,
+            etag=headers.get('ETag'),
+            last_modified=parse_http_date_safe(headers.get('Last-Modified')),
+        )
+        if not_modified is not None:
+            for header in ('ETag', 'Last-Modified'):
+                if header in headers:
+                    not_modified[header] = headers[header]
+            return not_modified
+        response = HttpResponse(entry['content'], headers=headers)
+        response.encoded_variants = entry.get('encoded')
+        return response
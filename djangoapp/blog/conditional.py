@@ -0,0 +1,112 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from blog.cache import fill_timeout, generation_time, get_generations
+from blog.pagination import cached_aggregate, count_cache_timeout
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest())
+
+
+def latest(*values):
+    return max((value for value in values if value), default=None)
+
+
+def timestamp(value):
+    return int(value.timestamp()) if value else None
+
+
+def set_validators(response, etag, last_modified):
+    if etag and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(timestamp(last_modified))
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Responde 304 Not Modified sem renderizar o template quando o navegador
+    (ou CDN) já tem a versão atual da página.
+
+    As subclasses implementam get_validators() com uma consulta barata que
+    retorna (etag, last_modified). As gerações do cache (blog.cache) entram
+    no ETag para cobrir o que não muda updated_at: tags, categorias, setup.
+    Pelo mesmo motivo o Last-Modified é o mais recente entre o updated_at e
+    o momento da última troca de geração (senão um cliente que só manda
+    If-Modified-Since recebe 304 depois de renomear uma tag ou apagar o
+    post mais recente).
+    """
+
+    def get_validators(self):
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp(last_modified),
+        )
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+
+        response = self.get_modified_response(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
+
+    def get_modified_response(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class ListConditionalGetMixin(ConditionalGetMixin):
+    # MAX(updated_at) e COUNT(*) dos posts visíveis, em cache junto com as gerações
+    # (um save no admin gera uma chave nova). O COUNT muda o ETag quando um post é
+    # apagado ou despublicado, e é reaproveitado pelo paginator (visible_count).
+    visible_count = None
+
+    # Total já mantido em outro lugar (ex.: contadores de blog.taxonomy). As
+    # gerações mudam a cada post salvo, então ETag = total + gerações e
+    # Last-Modified = última troca de geração bastam, sem o MAX/COUNT.
+    def get_known_count(self):
+        return None
+
+    def get_validators(self):
+        generations = get_generations(self.get_cache_namespaces())
+        known_count = self.get_known_count()
+        if known_count is not None:
+            self.visible_count = known_count
+            return make_etag(known_count, *generations), generation_time(generations)
+
+        stats = cached_aggregate(
+            self.get_queryset(), key_suffix=generations,
+            timeout=fill_timeout(count_cache_timeout(), generations),
+            last_modified=Max('updated_at'), total=Count('pk'),
+        )
+        self.visible_count = stats['total']
+        etag = make_etag(stats['last_modified'], stats['total'], *generations)
+        return etag, latest(stats['last_modified'], generation_time(generations))
+
+
+class DetailConditionalGetMixin(ConditionalGetMixin):
+    # O objeto é buscado uma vez só (com os JOINs da view) e serve tanto para
+    # os validadores quanto para renderizar a página.
+    def get_validators(self):
+        updated_at = self.object.updated_at
+        generations = get_generations(self.get_cache_namespaces())
+        etag = make_etag(updated_at, *generations)
+        return etag, latest(updated_at, generation_time(generations))
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super().get(request, *args, **kwargs)
+
+    # Mesmo corpo do BaseDetailView.get, sem o segundo get_object()
+    def get_modified_response(self, request, *args, **kwargs):
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
@@ -0,0 +1,107 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.benchmark import (
+    BASELINE, BenchmarkError, compare, queries_only, report_meta, route_urls,
+    run_client, run_server,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede todas as rotas de blog/urls.py (req/s, p50/p99 e queries) pelo test '
+        'client e, opcionalmente, contra um servidor com vários workers. Salva o '
+        'resultado em JSON e falha se piorar em relação ao --baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--cold', action='store_true', help='Limpa o cache antes de cada requisição',
+        )
+        parser.add_argument('--server', help='URL de um servidor já rodando')
+        parser.add_argument(
+            '--workers', type=int, help='Sobe um gunicorn com N workers para medir',
+        )
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=5, help='Segundos por rota')
+        parser.add_argument('--output', help='Arquivo JSON com o resultado')
+        parser.add_argument('--baseline', help='JSON de uma execução anterior para comparar')
+        parser.add_argument(
+            '--check', action='store_true',
+            help=f'Compara com o baseline versionado ({BASELINE.name}, só queries, a frio)',
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help=(
+                'Grava o resultado no arquivo do --baseline em vez de comparar '
+                '(sem --baseline: atualiza as queries do baseline versionado)'
+            ),
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Piora aceita em relação ao baseline (0.25 = 25%%)',
+        )
+
+    def handle(self, *args, **options):
+        if (options['check'] or options['save_baseline']) and not options['baseline']:
+            # O baseline versionado é medido a frio: com o cache quente toda
+            # rota faz 0 queries e a comparação não pegaria nada
+            options['cold'] = True
+        try:
+            urls = route_urls()
+            report = {
+                'meta': report_meta(
+                    iterations=options['iterations'], cold=options['cold'],
+                    workers=options['workers'], concurrency=options['concurrency'],
+                ),
+                'client': run_client(
+                    urls, options['iterations'], options['warmup'], options['cold'],
+                ),
+            }
+            if options['server'] or options['workers']:
+                report['server'] = run_server(
+                    urls, options['server'], options['workers'],
+                    options['concurrency'], options['duration'],
+                )
+        except BenchmarkError as error:
+            raise CommandError(error)
+
+        self.print_report(report)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+
+        baseline = options['baseline']
+        if options['save_baseline'] and not baseline:
+            BASELINE.write_text(json.dumps(queries_only(report), indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline gravado em {BASELINE}'))
+            return
+        if options['check'] and not baseline:
+            baseline = BASELINE
+
+        if baseline and options['save_baseline']:
+            Path(baseline).write_text(json.dumps(report, indent=2))
+            self.stdout.write(self.style.SUCCESS(f'Baseline gravado em {baseline}'))
+        elif baseline:
+            problems = compare(
+                report, json.loads(Path(baseline).read_text()), options['tolerance'],
+            )
+            if problems:
+                raise CommandError('Regressões:\n  ' + '\n  '.join(problems))
+            self.stdout.write(self.style.SUCCESS('Sem regressões em relação ao baseline'))
+
+    def print_report(self, report):
+        for mode in ('client', 'server'):
+            if mode not in report:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(mode))
+            for name, result in report[mode].items():
+                line = f'{name:>14}  {result["rps"]:9.1f} req/s'
+                if result['requests']:
+                    line += f'  p50 {result["p50_ms"]:7.1f} ms  p99 {result["p99_ms"]:7.1f} ms'
+                if 'queries' in result:
+                    line += f'  {result["queries"]:3d} queries'
+                self.stdout.write(line)
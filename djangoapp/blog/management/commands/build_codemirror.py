@@ -0,0 +1,42 @@
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.assets import CODEMIRROR_BUNDLE, codemirror_cdn_urls
+
+STATIC_DIR = Path(__file__).resolve().parents[2] / 'static'
+
+
+class Command(BaseCommand):
+    help = (
+        'Baixa o CodeMirror e os modos usados no post.html e junta tudo em um '
+        'único arquivo em blog/static (rode antes do collectstatic).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Baixa de novo mesmo se o bundle já existir',
+        )
+
+    def handle(self, *args, **options):
+        target = STATIC_DIR / CODEMIRROR_BUNDLE
+        if target.exists() and not options['force']:
+            self.stdout.write(f'{CODEMIRROR_BUNDLE} já existe')
+            return
+
+        parts = []
+        for url in codemirror_cdn_urls():
+            try:
+                with urlopen(url, timeout=30) as response:
+                    parts.append(f'/* {url} */\n'.encode() + response.read())
+            except OSError as error:
+                raise CommandError(f'Não foi possível baixar {url}: {error}')
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # ";" entre os arquivos: nenhum script depende do anterior terminar sem ele
+        target.write_bytes(b'\n;\n'.join(parts))
+        self.stdout.write(self.style.SUCCESS(
+            f'{CODEMIRROR_BUNDLE} criado ({target.stat().st_size} bytes)'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, PostAttachment
+from jobs.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = 'Enfileira as versões responsivas das capas e anexos já existentes'
+
+    def handle(self, *args, **options):
+        total = 0
+        covers = Post.objManager.exclude(cover='').values_list('cover', flat=True)
+        files = PostAttachment.objects.exclude(file='').values_list('file', flat=True)
+
+        for queryset, field_name in ((covers, 'cover'), (files, 'file')):
+            field = queryset.model._meta.get_field(field_name)
+            for name in queryset.iterator():
+                ImageJob.enqueue_derivatives(field.attr_class(None, field, name), 50)
+                total += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{total} imagens enfileiradas'))
@@ -0,0 +1,103 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.models import Category, Post, Tag
+from blog.views import PER_PAGE
+
+# Trechos do EXPLAIN que indicam leitura da tabela inteira ou ordenação em memória.
+# No SQLite, "SCAN blog_post" ordenado por -id com LIMIT percorre o rowid e para
+# cedo, então o aviso é um ponto para revisar, não necessariamente um problema.
+WARNINGS = {
+    'sqlite': ('SCAN blog_post\n', 'USE TEMP B-TREE'),
+    'postgresql': ('Seq Scan on blog_post ', 'Sort  '),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Mostra o EXPLAIN e o tempo das consultas das listagens públicas '
+        '(home, categoria, tag, autor). Use --seed para gerar posts de teste '
+        '(com o seed_blog).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Cria N posts sintéticos antes com o seed_blog (NÃO use no banco de produção)',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Quantas vezes cada consulta roda para medir o tempo',
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            # Mesmo caminho do import_posts: índice de busca, HTML renderizado e slugs
+            call_command(
+                'seed_blog', posts=options['seed'], batch_size=options['batch_size'],
+                stdout=self.stdout,
+            )
+            self.analyze()
+
+        problems = 0
+        for name, queryset in self.access_paths().items():
+            plan = queryset.explain()
+            elapsed = self.measure(queryset, options['repeat'])
+            suspicious = [
+                marker.strip() for marker in WARNINGS.get(connection.vendor, ())
+                if marker in plan + '\n'
+            ]
+            problems += bool(suspicious)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name} ({elapsed:.2f} ms)'
+            ))
+            self.stdout.write(plan)
+            if suspicious:
+                self.stdout.write(self.style.WARNING(
+                    'ATENÇÃO: ' + ', '.join(suspicious)
+                ))
+            self.stdout.write('')
+
+        style = self.style.WARNING if problems else self.style.SUCCESS
+        self.stdout.write(style(f'{problems} consulta(s) para revisar'))
+
+    def access_paths(self):
+        published = Post.objManager.get_published()
+        category = Category.objects.filter(post__is_published=True).first()
+        tag = Tag.objects.filter(post__is_published=True).first()
+        author = User.objects.filter(post_created_by__is_published=True).first()
+        middle = published.values_list('pk', flat=True)[PER_PAGE * 100:][:1]
+
+        return {
+            'index': published[:PER_PAGE],
+            'index (keyset)': published.filter(pk__lt=middle.first() or 0)[:PER_PAGE + 1],
+            'category': published.filter(
+                category_id=getattr(category, 'pk', 0),
+            )[:PER_PAGE],
+            'tag': published.filter(tags__id=getattr(tag, 'pk', 0))[:PER_PAGE],
+            'created_by': published.filter(
+                created_by__pk=getattr(author, 'pk', 0),
+            )[:PER_PAGE],
+            # Equivalente ao MAX(updated_at) usado no ETag
+            'last modified': published.order_by('-updated_at').values('updated_at')[:1],
+        }
+
+    def measure(self, queryset, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())  # .all() cria um clone, sem reaproveitar cache
+        return (time.perf_counter() - start) * 1000 / max(repeat, 1)
+
+    def analyze(self):
+        # Atualiza as estatísticas para o planner escolher os índices novos
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE blog_post, blog_post_tags')
+            else:
+                cursor.execute('ANALYZE')
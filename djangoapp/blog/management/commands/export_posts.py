@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.transfer import FORMATS, export_records, guess_format, write_records
+
+
+class Command(BaseCommand):
+    help = 'Exporta os posts para JSONL ou CSV (o formato lido pelo import_posts)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo de saída ("-" para stdout)')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--published', action='store_true', help='Só os posts publicados',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or guess_format(path)
+        queryset = Post.objManager.using(options['database'])
+        if options['published']:
+            queryset = queryset.filter(is_published=True)
+
+        records = export_records(queryset, options['batch_size'])
+        if path == '-':
+            self.stdout.ending = ''  # As linhas já terminam com \n
+            write_records(self.stdout, records, file_format)
+            return
+
+        total = 0
+
+        def counted(records):
+            nonlocal total
+            for total, record in enumerate(records, 1):
+                yield record
+
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            write_records(file, counted(records), file_format)
+        self.stdout.write(self.style.SUCCESS(f'{total} posts exportados para {path}'))
@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.transfer import FORMATS, PostImporter, guess_format, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa posts de um arquivo JSONL ou CSV (formato do export_posts) em lotes. '
+        'Posts com slug existente são atualizados; categorias e tags que não '
+        'existem são criadas. As imagens vão para a fila do process_image_jobs'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo de entrada ("-" para stdin)')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--database')
+        parser.add_argument(
+            '--no-images', action='store_true',
+            help='Não enfileira o processamento das capas',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or guess_format(path)
+        importer = PostImporter(
+            using=options['database'], batch_size=options['batch_size'],
+            images=not options['no_images'],
+        )
+
+        file = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            importer.run(read_records(file, file_format))
+        except (ValueError, KeyError) as error:
+            # Os lotes anteriores já foram gravados (uma transação por lote)
+            raise CommandError(
+                f'Erro no lote a partir do registro {importer.processed + 1}: {error!r}'
+            )
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{importer.created} posts criados, {importer.updated} atualizados'
+        ))
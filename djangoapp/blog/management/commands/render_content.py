@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate
+from blog.models import Page, Post
+from utils.html import render_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Regera o HTML renderizado (content_html/excerpt_html) de posts e páginas. '
+        'Use depois de mudar as regras de utils/html.py'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        changed = 0
+        for model in (Post, Page):
+            count = render_rows(
+                model, model.rendered_fields, batch_size=options['batch_size'],
+            )
+            changed += count
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count} atualizados')
+
+        if changed:
+            invalidate('site')
+        self.stdout.write(self.style.SUCCESS(f'{changed} registros renderizados'))
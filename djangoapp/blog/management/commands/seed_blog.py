@@ -0,0 +1,122 @@
+import random
+from datetime import timedelta
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Page
+from blog.transfer import PostImporter
+from site_setup.models import MenuLink, SiteSetup
+
+# Palavras do conteúdo gerado (a busca do benchmark usa a primeira)
+WORDS = (
+    'django python cache banco consulta índice template página servidor '
+    'desempenho imagem resposta latência worker conexão réplica'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        'Adiciona dados sintéticos (posts, tags, categorias, autores, capas e páginas) '
+        'para o benchmark. Usa o mesmo caminho em lote do import_posts. '
+        'NÃO use no banco de produção'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--tags', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--pages', type=int, default=3)
+        parser.add_argument(
+            '--images', type=int, default=10,
+            help='Quantas capas diferentes gerar (repetidas entre os posts, 0 = sem capa)',
+        )
+        parser.add_argument(
+            '--process-images', action='store_true',
+            help='Roda o process_image_jobs no final (senão as capas ficam na fila)',
+        )
+        parser.add_argument('--random-seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['random_seed'])  # Mesmos dados a cada execução
+        self.site_setup()
+        usernames = self.users(options['users'])
+        covers = self.covers(options['images'], rng)
+        self.pages(options['pages'])
+
+        importer = PostImporter(batch_size=options['batch_size'])
+        importer.run(self.records(options, rng, usernames, covers))
+        self.stdout.write(f'{importer.created} posts criados')
+
+        if options['process_images'] and covers:
+            call_command('process_image_jobs', once=True, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Dados de benchmark gerados'))
+
+    def records(self, options, rng, usernames, covers):
+        now = timezone.now()
+        for number in range(options['posts']):
+            category = rng.randrange(options['categories']) if options['categories'] else None
+            paragraphs = ''.join(
+                f'<p>{" ".join(rng.choices(WORDS, k=40))}</p>' for _ in range(5)
+            )
+            yield {
+                'title': f'Bench {number} {rng.choice(WORDS)}',
+                'excerpt': ' '.join(rng.choices(WORDS, k=15)),
+                'content': f'<h2>Introdução</h2>{paragraphs}<h2>Conclusão</h2>{paragraphs}',
+                'is_published': rng.random() < 0.9,
+                'created_at': (now - timedelta(minutes=number)).isoformat(),
+                'created_by': rng.choice(usernames) if usernames else '',
+                'category': {
+                    'slug': f'bench-{category}', 'name': f'Bench {category}',
+                } if category is not None else None,
+                'tags': [
+                    f'bench-{tag}'
+                    for tag in rng.sample(range(options['tags']), min(3, options['tags']))
+                ],
+                'cover': rng.choice(covers) if covers else '',
+            }
+
+    def site_setup(self):
+        if SiteSetup.objects.exists():
+            return
+        setup = SiteSetup.objects.create(title='Benchmark', description='Dados gerados')
+        MenuLink.objects.create(text='Home', url_or_path='/', site_setup=setup)
+
+    def users(self, total):
+        usernames = [f'bench{number}' for number in range(total)]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        User.objects.bulk_create([
+            User(username=username, first_name='Bench', last_name=username)
+            for username in usernames if username not in existing
+        ])
+        return usernames
+
+    def pages(self, total):
+        for number in range(total):
+            Page.objects.get_or_create(
+                slug=f'bench-{number}',
+                defaults={
+                    'title': f'Página {number}', 'is_published': True,
+                    'content': f'<p>{" ".join(WORDS)}</p>',
+                },
+            )
+
+    def covers(self, total, rng):
+        names = []
+        for number in range(total):
+            name = f'posts/bench/bench-{number}.jpg'
+            color = tuple(rng.randrange(256) for _ in range(3))
+            if not default_storage.exists(name):
+                buffer = BytesIO()
+                Image.new('RGB', (1200, 675), color).save(buffer, 'JPEG', quality=80)
+                name = default_storage.save(name, ContentFile(buffer.getvalue()))
+            names.append(name)
+        return names
@@ -0,0 +1,36 @@
+from django.db import DatabaseError, migrations
+
+
+def create_search_index(apps, schema_editor):
+    from blog.search import VENDOR_BACKENDS
+
+    backend_class = VENDOR_BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class is None:
+        return  # Sem índice: a busca usa icontains
+
+    backend = backend_class(schema_editor.connection.alias)
+    try:
+        backend.install()
+    except DatabaseError:
+        return  # Ex.: SQLite compilado sem FTS5
+
+    backend.rebuild(apps.get_model('blog', 'Post'))
+
+
+def drop_search_index(apps, schema_editor):
+    from blog.search import VENDOR_BACKENDS
+
+    backend_class = VENDOR_BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class is not None:
+        backend_class(schema_editor.connection.alias).uninstall()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_alter_page_managers'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_page_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-id'], name='post_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-id'], name='post_published_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['created_by', '-id'], name='post_published_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['updated_at'], name='post_published_updated_idx'),
+        ),
+        # Listagem por tag: percorre (tag_id, post_id) já ordenado, sem SORT
+        migrations.RunSQL(
+            'CREATE INDEX blog_post_tags_tag_post_idx '
+            'ON blog_post_tags (tag_id, post_id)',
+            'DROP INDEX blog_post_tags_tag_post_idx',
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+def render_existing_content(apps, schema_editor):
+    from utils.html import render_rows
+
+    Post = apps.get_model('blog', 'Post')
+    Page = apps.get_model('blog', 'Page')
+    render_rows(Post, {'excerpt': 'excerpt_html', 'content': 'content_html'})
+    render_rows(Page, {'content': 'content_html'})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_published_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='content_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(render_existing_content, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,26 @@
+from functools import partial
+
 from django.db import models
-from utils.rands import slugify_new
-from utils.images import resize_image
+from utils.rands import save_with_unique_slug
+from jobs.models import ImageJob
+from blog.search import get_search_backend
 from datetime import datetime
 from django.contrib.auth.models import User
 from django_summernote.models import AbstractAttachment
 from django.urls import reverse
+from utils.html import render_html
+
+# save(update_fields=['content']) também precisa gravar o content_html
+def with_rendered_fields(instance, kwargs):
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None:
+        return kwargs
+    rendered = {
+        target for source, target in instance.rendered_fields.items()
+        if source in update_fields
+    }
+    return {**kwargs, 'update_fields': {*update_fields, *rendered}}
+
 
 # Create your models here.
 class PostAttachment(AbstractAttachment):
@@ -19,9 +35,10 @@ class PostAttachment(AbstractAttachment):
         if self.file:
             image_changed = current_file_name != self.file.name
 
-        # Se o FILE foi enviado, redimensionamos este FILE dps que foi enviado e salva.
+        # Se o FILE foi enviado, o redimensionamento vai para a fila (process_image_jobs).
         if image_changed:
-            resize_image(self.file, 900, True, 50)
+            ImageJob.enqueue(self.file, 900, True, 50)
+            ImageJob.enqueue_derivatives(self.file, 50)  # Versões para o srcset
         
         return super_save
 
@@ -39,10 +56,11 @@ class Tag(models.Model):
     )
 
     def save(self, *args, **kwargs):
-        # Se nao existe uma SLUG, vou criar uma...
-        if not self.slug:
-            self.slug = slugify_new(self.name, 5)  # Pegando o nome da TAG e gerando a partir disso.
-        return super().save(*args, **kwargs)
+        # Se nao existe uma SLUG, vou criar uma a partir do nome da TAG (único no banco)
+        return save_with_unique_slug(
+            self, self.name, 5, partial(super().save, *args, **kwargs),
+            using=kwargs.get('using'),
+        )
     
     # Quando eu entro dentro de uma categoria, esse será o TÍTULO que aparecerá.
     def __str__(self) -> str:
@@ -62,12 +80,13 @@ class Category(models.Model):
     )
 
     # Verifica se existe o SLUG
-    # Insere um novo SLUG se não existe
+    # Insere um novo SLUG (único no banco) se não existe
     # Salva no banco de dados esse novo SLUG
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify_new(self.name, 5)
-        return super().save(*args, **kwargs)
+        return save_with_unique_slug(
+            self, self.name, 5, partial(super().save, *args, **kwargs),
+            using=kwargs.get('using'),
+        )
     
     # Quando eu entro dentro de uma categoria, esse será o TÍTULO que aparecerá.
     def __str__(self) -> str:
@@ -89,16 +108,28 @@ class Page(models.Model):
         help_text='Este campo precisará estar marcado para a página ser exibida publicamente'
     )
     content = models.TextField()
+    # HTML do content já sanitizado e processado (utils.html), gerado no save
+    content_html = models.TextField(default='', editable=False)
+    updated_at = models.DateTimeField(auto_now=True)  # Usado no Last-Modified/ETag da página
 
     def get_absolute_url(self):
         if not self.is_published:
             return reverse('blog:index')
         return reverse('blog:page', args=(self.slug,))
 
+    # Campo original -> campo renderizado (utils.html)
+    rendered_fields = {'content': 'content_html'}
+
+    def render_content(self):
+        self.content_html = render_html(self.content)
+
     def save(self, *args, **kwargs):
-        if not self.title:
-            self.title = slugify_new(self.title, 5)
-        return super().save(*args, **kwargs)
+        self.render_content()
+        kwargs = with_rendered_fields(self, kwargs)
+        return save_with_unique_slug(
+            self, self.title, 5, partial(super().save, *args, **kwargs),
+            using=kwargs.get('using'),
+        )
     
     # Quando eu entro dentro de uma categoria, esse será o TÍTULO que aparecerá.
     def __str__(self) -> str:
@@ -106,6 +137,10 @@ class Page(models.Model):
 
 
 
+# Colunas carregadas nas listagens de posts (cards)
+CARD_FIELDS = ('id', 'title', 'slug', 'excerpt', 'cover', 'is_published')
+
+
 class PostManager(models.Manager):
     def get_published(self):  # self representa a instancia dessa classe, no caso: OBJECTS
         return (
@@ -113,6 +148,10 @@ class PostManager(models.Manager):
             .filter(is_published=True)
             .order_by('-pk')  # Prevalece o post mais recente.
         )
+
+    # Só as colunas usadas pelo _post_card.html (sem o content, que pode ser enorme)
+    def get_published_cards(self):
+        return self.get_published().only(*CARD_FIELDS)
     
 
 
@@ -120,6 +159,28 @@ class Post(models.Model):
     class Meta:
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
+        # Índices parciais (só posts publicados) para o PostManager.get_published()
+        # e suas variações. Todas as listagens ordenam por -pk.
+        # O índice (tag_id, post_id) da tabela de tags fica na migration 0013.
+        indexes = [
+            models.Index(
+                fields=['-id'], name='post_published_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=['category', '-id'], name='post_published_category_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=['created_by', '-id'], name='post_published_author_idx',
+                condition=models.Q(is_published=True),
+            ),
+            # MAX(updated_at) do ETag das listagens
+            models.Index(
+                fields=['updated_at'], name='post_published_updated_idx',
+                condition=models.Q(is_published=True),
+            ),
+        ]
     
     objManager = PostManager()
 
@@ -137,6 +198,10 @@ class Post(models.Model):
         ),
     )
     content = models.TextField(default='')
+    # Versões já sanitizadas e processadas (utils.html), geradas no save.
+    # O post.html usa só estas; o content original fica para o admin e a busca.
+    excerpt_html = models.TextField(default='', editable=False)
+    content_html = models.TextField(default='', editable=False)
     cover = models.ImageField(upload_to='posts/%Y/%m/', blank=True, default='')  # Esse atributo, tem outro atributo dentro dele que é uma URL da IMAGEM
     cover_in_post_content = models.BooleanField(
         default=True,
@@ -176,18 +241,32 @@ class Post(models.Model):
         # E com isso trazendo dinamicidade na hora de requerir a URL do post único.
 
     
+    # Campo original -> campo renderizado (utils.html)
+    rendered_fields = {'excerpt': 'excerpt_html', 'content': 'content_html'}
+
+    def render_content(self):
+        self.excerpt_html = render_html(self.excerpt)
+        self.content_html = render_html(self.content)
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify_new(self.title, 4)
+        self.render_content()
+        kwargs = with_rendered_fields(self, kwargs)
 
         current_cover_name = str(self.cover.name)
-        super_save = super().save(*args, **kwargs)
+        super_save = save_with_unique_slug(
+            self, self.title, 4, partial(super().save, *args, **kwargs),
+            using=kwargs.get('using'),
+        )
         cover_changed = False
         
         if self.cover: # Retorna TRUE se atual nome do cover for diferente que o nome do cover cadastrado no BD no momento
             cover_changed = current_cover_name != self.cover  # Isso retorna BOOLEAN TYPE
 
         if cover_changed:  # se a variavel for true executa o IF
-            resize_image(self.cover, 900, True, 50)
+            ImageJob.enqueue(self.cover, 900, True, 50)  # Redimensiona fora da requisição
+            ImageJob.enqueue_derivatives(self.cover, 50)  # Versões para o srcset
+
+        # Atualiza só este post no índice de busca
+        get_search_backend(self._state.db).index_post(self)
 
         return super_save
\ No newline at end of file
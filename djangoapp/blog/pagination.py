@@ -0,0 +1,193 @@
+import hashlib
+from math import ceil
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.http import Http404
+from django.utils.functional import cached_property
+
+# Tempo padrão (segundos) do total de posts em cache
+DEFAULT_COUNT_TIMEOUT = 60
+
+
+def count_cache_timeout():
+    return getattr(settings, 'BLOG_COUNT_CACHE_TIMEOUT', DEFAULT_COUNT_TIMEOUT)
+
+
+def cached_aggregate(queryset, key_suffix='', timeout=None, **aggregates):
+    # Agregações (COUNT, MAX...) rodam no máximo uma vez por TTL para cada filtro.
+    # key_suffix permite invalidar antes do TTL (ex.: gerações do blog.cache).
+    if timeout is None:
+        timeout = count_cache_timeout()
+    queryset = queryset.order_by()
+    sql_hash = hashlib.md5(
+        f'{queryset.query}:{sorted(aggregates)}:{key_suffix}'.encode()
+    ).hexdigest()
+    key = f'blog:aggregate:{queryset.model._meta.label_lower}:{sql_hash}'
+
+    result = cache.get(key)
+    if result is None:
+        result = queryset.aggregate(**aggregates)
+        cache.add(key, result, timeout)  # Preenchimento: add não invalida o L1 dos outros
+    return result
+
+
+def cached_count(queryset, timeout=None):
+    # Total aproximado: o COUNT(*) roda no máximo uma vez por TTL para cada filtro
+    return cached_aggregate(
+        queryset, timeout=timeout, total=Count('pk'),
+    )['total']
+
+
+class CountedPaginator(Paginator):
+    # Paginator que aceita um total já conhecido, sem rodar outro COUNT(*)
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if count is not None:
+            self.count = count
+
+
+class KeysetPaginator:
+    """
+    Paginação por cursor (seek) em -pk.
+
+    Em vez de OFFSET, cada página filtra pk < último pk da página anterior
+    (ou pk > primeiro pk, voltando). O custo não cresce com o número da página.
+    """
+
+    def __init__(self, queryset, per_page, count=None):
+        self.queryset = queryset.order_by('-pk')
+        self.per_page = per_page
+        self._count = count
+
+    @cached_property
+    def count(self):
+        if self._count is not None:
+            return self._count
+        return cached_count(self.queryset)
+
+    @cached_property
+    def num_pages(self):
+        return max(ceil(self.count / self.per_page), 1)
+
+    def page_from_request(self, request):
+        params = request.GET
+        try:
+            number = int(params.get('page') or 1)
+            after = int(params['after']) if params.get('after') else None
+            before = int(params['before']) if params.get('before') else None
+        except ValueError:
+            raise Http404('Página inválida')
+
+        if params.get('last'):
+            return self.last_page()
+        if after is not None:
+            return self.page_after(after, number)
+        if before is not None:
+            return self.page_before(before, number)
+        if number > 1:
+            # Link sem cursor (ex.: ?page=5 digitado): cai no OFFSET
+            return self.page_by_offset(number)
+        return self.first_page()
+
+    def first_page(self):
+        rows = list(self.queryset[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page], 1, self,
+            has_previous=False, has_next=len(rows) > self.per_page,
+        )
+
+    def page_after(self, pk, number):
+        rows = list(self.queryset.filter(pk__lt=pk)[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page], number, self,
+            has_previous=True, has_next=len(rows) > self.per_page,
+        )
+
+    def page_before(self, pk, number):
+        rows = list(
+            self.queryset.filter(pk__gt=pk)
+            .order_by('pk')[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return KeysetPage(
+            rows, number if has_previous else 1, self,
+            has_previous=has_previous, has_next=True,
+        )
+
+    def last_page(self):
+        remainder = self.count - (self.num_pages - 1) * self.per_page
+        rows = list(self.queryset.order_by('pk')[:max(remainder, 0)])[::-1]
+        return KeysetPage(
+            rows, self.num_pages, self,
+            has_previous=self.num_pages > 1, has_next=False,
+        )
+
+    def page_by_offset(self, number):
+        number = min(number, self.num_pages)
+        offset = (number - 1) * self.per_page
+        rows = list(self.queryset[offset:offset + self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page], number, self,
+            has_previous=number > 1, has_next=len(rows) > self.per_page,
+        )
+
+
+class KeysetPage:
+    """
+    Mesma interface usada pelo _pagination.html na Page do Django, mais os
+    cursores (next_cursor, previous_cursor e last_cursor) para os links.
+    """
+
+    def __init__(self, object_list, number, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = min(max(number, 1), paginator.num_pages)
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f'<KeysetPage {self.number} of {self.paginator.num_pages}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def next_page_number(self):
+        return min(self.number + 1, self.paginator.num_pages)
+
+    def previous_page_number(self):
+        return max(self.number - 1, 1)
+
+    @property
+    def next_cursor(self):
+        if not self.object_list:
+            return ''
+        return f'&after={self.object_list[-1].pk}'
+
+    @property
+    def previous_cursor(self):
+        if not self.object_list or self.previous_page_number() == 1:
+            return ''  # Página 1 não precisa de cursor
+        return f'&before={self.object_list[0].pk}'
+
+    @property
+    def last_cursor(self):
+        return '&last=1'
@@ -0,0 +1,323 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils.html import strip_tags
+from django.utils.module_loading import import_string
+
+# Pesos de cada coluna no ranking: título > resumo > conteúdo
+TITLE_WEIGHT = 10.0
+EXCERPT_WEIGHT = 5.0
+CONTENT_WEIGHT = 1.0
+
+_WORDS = re.compile(r'\w+', re.UNICODE)
+
+
+def post_document(pk, title, excerpt, content):
+    # O conteúdo vem do summernote em HTML, indexamos apenas o texto
+    return pk, title or '', strip_tags(excerpt or ''), strip_tags(content or '')
+
+
+class SearchResults:
+    """
+    Resultado preguiçoso de uma busca ranqueada.
+
+    O Paginator só precisa de count() e de fatiamento ([inicio:fim]),
+    então cada página executa apenas a consulta da sua fatia de ids.
+    """
+    ordered = True
+
+    def __init__(self, backend, query, queryset):
+        self.backend = backend
+        self.query = query
+        self.queryset = queryset
+        self.model = queryset.model
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.query)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, k):
+        if not isinstance(k, slice):
+            return self[k:k + 1][0]
+
+        start = k.start or 0
+        limit = None if k.stop is None else max(k.stop - start, 0)
+        ids = self.backend.ranked_ids(self.query, start, limit)
+        posts = self.queryset.filter(pk__in=ids).in_bulk()
+        return [posts[pk] for pk in ids if pk in posts]
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+class BaseSearchBackend:
+    def __init__(self, using='default'):
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def is_available(self):
+        return True
+
+    def install(self):
+        pass
+
+    def index_post(self, post):
+        self.index_rows([
+            (post.pk, post.title, post.excerpt, post.content),
+        ])
+
+    def index_rows(self, rows):
+        pass
+
+    def remove_post(self, pk):
+        pass
+
+    def rebuild(self, post_model=None):
+        if post_model is None:
+            from blog.models import Post
+            post_model = Post
+
+        self.clear()
+        rows = (
+            post_model._base_manager.using(self.using)
+            .order_by('pk')
+            .values_list('pk', 'title', 'excerpt', 'content')
+        )
+        batch = []
+        for row in rows.iterator(chunk_size=500):
+            batch.append(row)
+            if len(batch) >= 500:
+                self.index_rows(batch)
+                batch = []
+        self.index_rows(batch)
+
+    def clear(self):
+        pass
+
+    def search(self, query, queryset):
+        return SearchResults(self, query, queryset)
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Busca com icontains, sem índice. Usada quando o banco não tem
+    suporte a busca textual (ou para desativar o índice).
+    """
+
+    def search(self, query, queryset):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(excerpt__icontains=query) |
+            Q(content__icontains=query)
+        )
+
+
+class IndexedSearchBackend(BaseSearchBackend):
+    """Base dos backends que mantêm uma tabela de índice própria."""
+    table = ''
+
+    def __init__(self, using='default'):
+        super().__init__(using)
+        self._available = None
+
+    def is_available(self):
+        if self._available is None:
+            with self.connection.cursor() as cursor:
+                self._available = self.table in (
+                    self.connection.introspection.table_names(cursor)
+                )
+        return self._available
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+        self._available = False
+
+    def _execute(self, sql, params):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+class SQLiteSearchBackend(IndexedSearchBackend):
+    """Índice invertido com FTS5 (tabela virtual blog_post_fts)."""
+    table = 'blog_post_fts'
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} '
+                'USING fts5(title, excerpt, content, '
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        self._available = True
+
+    def index_rows(self, rows):
+        rows = [post_document(*row) for row in rows]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(row[0],) for row in rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, excerpt, content) '
+                'VALUES (%s, %s, %s, %s)',
+                rows,
+            )
+
+    def remove_post(self, pk):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def match_expression(self, query):
+        # Cada palavra vira um termo entre aspas (sem operadores do FTS5)
+        # com busca por prefixo. Termos separados por espaço = AND.
+        return ' '.join(f'"{word}"*' for word in _WORDS.findall(query))
+
+    def count(self, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return 0
+        return self._execute(
+            f'SELECT COUNT(*) FROM {self.table} '
+            f'JOIN blog_post ON blog_post.id = {self.table}.rowid '
+            f'WHERE {self.table} MATCH %s AND blog_post.is_published',
+            [expression],
+        )[0][0]
+
+    def ranked_ids(self, query, offset, limit):
+        expression = self.match_expression(query)
+        if not expression or limit == 0:
+            return []
+        rank = (
+            f'bm25({self.table}, '
+            f'{TITLE_WEIGHT}, {EXCERPT_WEIGHT}, {CONTENT_WEIGHT})'
+        )
+        rows = self._execute(
+            f'SELECT {self.table}.rowid FROM {self.table} '
+            f'JOIN blog_post ON blog_post.id = {self.table}.rowid '
+            f'WHERE {self.table} MATCH %s AND blog_post.is_published '
+            f'ORDER BY {rank}, blog_post.id DESC '
+            'LIMIT %s OFFSET %s',
+            [expression, -1 if limit is None else limit, offset],
+        )
+        return [row[0] for row in rows]
+
+
+class PostgresSearchBackend(IndexedSearchBackend):
+    """Índice invertido com tsvector + GIN (tabela blog_post_search)."""
+    table = 'blog_post_search'
+
+    @property
+    def config(self):
+        return getattr(settings, 'BLOG_SEARCH_CONFIG', 'portuguese')
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ('
+                'post_id bigint PRIMARY KEY '
+                'REFERENCES blog_post (id) ON DELETE CASCADE, '
+                'document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {self.table}_document_gin '
+                f'ON {self.table} USING GIN (document)'
+            )
+        self._available = True
+
+    def index_rows(self, rows):
+        config = self.config
+        rows = [
+            (config, title, config, excerpt, config, content, pk)
+            for pk, title, excerpt, content in (
+                post_document(*row) for row in rows
+            )
+        ]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (document, post_id) VALUES ('
+                "setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'B') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'C'), %s) "
+                'ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document',
+                rows,
+            )
+
+    def remove_post(self, pk):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE post_id = %s', [pk])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {self.table}')
+
+    def count(self, query):
+        if not query.strip():
+            return 0
+        return self._execute(
+            f'SELECT COUNT(*) FROM {self.table} s '
+            'JOIN blog_post p ON p.id = s.post_id '
+            'WHERE s.document @@ websearch_to_tsquery(%s::regconfig, %s) '
+            'AND p.is_published',
+            [self.config, query],
+        )[0][0]
+
+    def ranked_ids(self, query, offset, limit):
+        if not query.strip() or limit == 0:
+            return []
+        rows = self._execute(
+            f'SELECT s.post_id FROM {self.table} s '
+            'JOIN blog_post p ON p.id = s.post_id, '
+            'websearch_to_tsquery(%s::regconfig, %s) q '
+            'WHERE s.document @@ q AND p.is_published '
+            'ORDER BY ts_rank_cd(s.document, q) DESC, p.id DESC '
+            'LIMIT %s OFFSET %s',
+            [self.config, query, limit, offset],
+        )
+        return [row[0] for row in rows]
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backends = {}
+
+
+def get_backend_class(using='default'):
+    path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)
+    vendor = connections[using].vendor
+    return VENDOR_BACKENDS.get(vendor, DatabaseSearchBackend)
+
+
+def get_search_backend(using='default'):
+    # Uma instância por alias de banco. Se o índice não existir
+    # (ex.: SQLite sem FTS5), cai para a busca com icontains.
+    if using not in _backends:
+        backend = get_backend_class(using)(using)
+        if not backend.is_available():
+            backend = DatabaseSearchBackend(using)
+        _backends[using] = backend
+    return _backends[using]
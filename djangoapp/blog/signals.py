@@ -0,0 +1,242 @@
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from blog.cache import invalidate, invalidate_post_card
+from blog.models import Category, Page, Post, Tag
+from blog.search import get_search_backend
+from blog.taxonomy import (
+    adjust_count, invalidate_count, invalidate_label, post_counters,
+)
+from jobs.models import ImageJob
+from utils.html import render_rows
+from jobs.signals import image_processed
+from site_setup.models import MenuLink, SiteSetup
+
+
+# A indexação acontece no Post.save, aqui só removemos do índice
+@receiver(post_delete, sender=Post)
+def remove_post_from_search_index(sender, instance, using, **kwargs):
+    get_search_backend(using).remove_post(instance.pk)
+
+
+# Cache das páginas públicas (blog.cache)
+# Guardamos o slug antigo para invalidar também a URL anterior do post/página.
+# No Post guardamos também o que define os contadores (blog.taxonomy).
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Page)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Tag)
+def remember_old_slug(sender, instance, **kwargs):
+    instance._old_slug = None
+    instance._old_counted = (False, set())
+    if not instance.pk:
+        return
+
+    fields = ['slug']
+    if sender is Post:
+        fields += ['is_published', 'category_id', 'created_by_id']
+    old = sender._base_manager.filter(pk=instance.pk).values(*fields).first()
+    if old is None:
+        return
+
+    instance._old_slug = old['slug']
+    if sender is Post:
+        instance._old_counted = (old['is_published'], post_counters(
+            old['is_published'], old['category_id'], old['created_by_id'],
+        ))
+
+
+# Gerações, cards e contadores só mudam depois do commit: antes disso uma
+# requisição anônima ainda lê as linhas antigas e as guardaria no cache com a
+# geração nova (e um save desfeito pelo rollback não mexe nos contadores).
+# Fora de uma transação o on_commit roda na hora.
+def _after_commit(using, func, *args):
+    transaction.on_commit(partial(func, *args), using=using)
+
+
+def _slug_namespaces(prefix, instance):
+    slugs = {instance.slug, getattr(instance, '_old_slug', None)}
+    return [f'{prefix}:{slug}' for slug in slugs if slug]
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    _after_commit(kwargs.get('using'), invalidate_post_card, instance.pk)
+    _after_commit(kwargs.get('using'), invalidate, 'lists', *_slug_namespaces('post', instance))
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+
+    if reverse:  # tag.post_set.add(...): instance é a Tag
+        posts = Post.objManager.filter(pk__in=pk_set or [])
+        if action == 'post_clear':
+            posts = Post.objManager.filter(tags=instance)
+        slugs = posts.values_list('slug', flat=True)
+        _after_commit(kwargs.get('using'), invalidate, 'lists', *(f'post:{slug}' for slug in slugs))
+    else:
+        _after_commit(kwargs.get('using'), invalidate, 'lists', f'post:{instance.slug}')
+
+
+# Nome/slug de tag e categoria aparecem nas listagens e nos posts que as usam
+def _taxonomy_post_slugs(sender, instance):
+    lookup = 'tags' if sender is Tag else 'category'
+    return list(
+        Post.objManager.filter(**{lookup: instance}).values_list('slug', flat=True)
+    )
+
+
+# No post_delete as linhas do m2m já foram apagadas e o Post.category já é
+# NULL (SET_NULL), então os posts afetados são lidos antes de apagar
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Category)
+def remember_taxonomy_posts(sender, instance, **kwargs):
+    instance._post_slugs = _taxonomy_post_slugs(sender, instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def taxonomy_changed(sender, instance, **kwargs):
+    kind = 'tag' if sender is Tag else 'category'
+    _after_commit(
+        kwargs.get('using'), invalidate_label,
+        kind, instance.slug, getattr(instance, '_old_slug', None),
+    )
+    _after_commit(kwargs.get('using'), invalidate_count, kind, instance.pk)
+    slugs = getattr(instance, '_post_slugs', None)
+    if slugs is None:
+        slugs = _taxonomy_post_slugs(sender, instance)
+    _after_commit(kwargs.get('using'), invalidate, 'lists', *(f'post:{slug}' for slug in slugs))
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def page_changed(sender, instance, **kwargs):
+    _after_commit(kwargs.get('using'), invalidate, *_slug_namespaces('page', instance))
+
+
+# Nome do autor aparece nos posts e no título da listagem por autor.
+# O login salva só last_login, que não precisa invalidar nada.
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'username', 'first_name', 'last_name'} & set(update_fields):
+        return
+    _after_commit(kwargs.get('using'), invalidate_label, 'author', instance.pk)
+    if Post.objManager.filter(created_by=instance).exists():
+        _after_commit(kwargs.get('using'), invalidate, 'site')
+
+
+# Os posts do autor apagado ficam sem autor (SET_NULL, sem signals no Post)
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, **kwargs):
+    _after_commit(kwargs.get('using'), invalidate_label, 'author', instance.pk)
+    _after_commit(kwargs.get('using'), invalidate_count, 'author', instance.pk)
+    _after_commit(kwargs.get('using'), invalidate, 'site')
+
+
+# Contadores de posts publicados por categoria/tag/autor (blog.taxonomy).
+# Ajustados com incr/decr depois do commit; se a chave não está no cache, nada a fazer.
+@receiver(post_save, sender=Post)
+def update_post_counters(sender, instance, created, **kwargs):
+    was_published, old = getattr(instance, '_old_counted', (False, set()))
+    new = post_counters(
+        instance.is_published, instance.category_id, instance.created_by_id,
+    )
+    for kind, pk in old - new:
+        _after_commit(kwargs.get('using'), adjust_count, kind, pk, -1)
+    for kind, pk in new - old:
+        _after_commit(kwargs.get('using'), adjust_count, kind, pk, 1)
+
+    if not created and was_published != instance.is_published:
+        delta = 1 if instance.is_published else -1
+        for tag_pk in instance.tags.values_list('pk', flat=True):
+            _after_commit(kwargs.get('using'), adjust_count, 'tag', tag_pk, delta)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_tags(sender, instance, **kwargs):
+    instance._old_tag_pks = []
+    if instance.is_published:
+        instance._old_tag_pks = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_counters(sender, instance, **kwargs):
+    for kind, pk in post_counters(
+        instance.is_published, instance.category_id, instance.created_by_id,
+    ):
+        _after_commit(kwargs.get('using'), adjust_count, kind, pk, -1)
+    for tag_pk in getattr(instance, '_old_tag_pks', []):
+        _after_commit(kwargs.get('using'), adjust_count, 'tag', tag_pk, -1)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_tag_counters(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:  # tag.post_set.add(...): recalcula o contador da tag
+        if action.startswith('post_'):
+            _after_commit(kwargs.get('using'), invalidate_count, 'tag', instance.pk)
+        return
+    if not instance.is_published:
+        return
+
+    if action == 'pre_clear':
+        instance._cleared_tag_pks = list(instance.tags.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_cleared_tag_pks', [])
+        delta = 1 if action == 'post_add' else -1
+        for tag_pk in pk_set or []:
+            _after_commit(kwargs.get('using'), adjust_count, 'tag', tag_pk, delta)
+
+
+# Header, menu e footer aparecem em todas as páginas
+@receiver(post_save, sender=SiteSetup)
+@receiver(post_delete, sender=SiteSetup)
+@receiver(post_save, sender=MenuLink)
+@receiver(post_delete, sender=MenuLink)
+def site_setup_changed(sender, **kwargs):
+    _after_commit(kwargs.get('using'), invalidate, 'site')
+
+
+# Pasta dos uploads do summernote (django_summernote.utils.uploaded_filepath)
+CONTENT_UPLOAD_DIR = 'django-summernote/'
+
+
+# Quando o worker termina as versões da capa, o card passa a usar o srcset
+# (o srcset só muda com as versões, não com o redimensionamento do original)
+@receiver(image_processed, sender=ImageJob)
+def cover_processed(sender, path, kind, **kwargs):
+    if kind != ImageJob.Kind.DERIVATIVES:
+        return
+    posts = list(Post.objManager.filter(cover=path).only('pk', 'slug'))
+    if posts:
+        invalidate_post_card(*(post.pk for post in posts))
+        invalidate('lists', *(f'post:{post.slug}' for post in posts))
+
+
+# Imagens do conteúdo (summernote): o srcset é gerado no render_html, então
+# regeramos o HTML dos posts/páginas que usam a imagem. A busca é um LIKE sem
+# índice nas duas tabelas: só para as versões de imagens do summernote (capas e
+# redimensionamentos, ex.: de um import em lote, não aparecem no conteúdo).
+@receiver(image_processed, sender=ImageJob)
+def content_image_processed(sender, path, kind, **kwargs):
+    if kind != ImageJob.Kind.DERIVATIVES or not path.startswith(CONTENT_UPLOAD_DIR):
+        return
+    posts = Post.objManager.filter(content__contains=path)
+    if render_rows(Post, Post.rendered_fields, queryset=posts):
+        invalidate('lists', *(f'post:{slug}' for slug in posts.values_list('slug', flat=True)))
+
+    pages = Page.objects.filter(content__contains=path)
+    if render_rows(Page, Page.rendered_fields, queryset=pages):
+        invalidate(*(f'page:{slug}' for slug in pages.values_list('slug', flat=True)))
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from blog.models import Category, Post, Tag
+from project.metrics import cache_accessed
+
+# Rede de segurança: os signals do blog mantêm nomes e contadores atualizados,
+# mas se algo escapar (ex.: update() direto no banco) o valor expira sozinho.
+# Os contadores (total da listagem, 404 e ETag) expiram bem antes dos nomes.
+TAXONOMY_TIMEOUT = 60 * 60 * 24
+COUNT_TIMEOUT = 60 * 5
+
+# As faltas são calculadas no primário: uma réplica atrasada (ou o que ainda
+# não foi commitado) ficaria no cache até expirar
+FILL_DB = 'default'
+
+# tipo -> (model, campo usado na URL, filtro do Post pelo pk)
+KINDS = {
+    'category': (Category, 'slug', 'category_id'),
+    'tag': (Tag, 'slug', 'tags__id'),
+    'author': (User, 'pk', 'created_by_id'),
+}
+
+
+def _label_key(kind, value):
+    return f'blog:label:{kind}:{value}'
+
+
+def _count_key(kind, pk):
+    return f'blog:count:{kind}:{pk}'
+
+
+def _display_name(kind, obj):
+    if kind == 'author':
+        full_name = f'{obj.first_name} {obj.last_name}'.strip()
+        return full_name if obj.first_name else obj.username
+    return obj.name
+
+
+def get_label(kind, value):
+    """(pk, nome) da categoria/tag pelo slug ou do autor pelo pk, ou None."""
+    key = _label_key(kind, value)
+    label = cache.get(key)
+    cache_accessed.send(sender=KINDS[kind][0], name='taxonomy', hit=label is not None)
+    if label is None:
+        model, field, _ = KINDS[kind]
+        obj = model._default_manager.using(FILL_DB).filter(**{field: value}).first()
+        if obj is None:
+            return None  # Não guardamos "não existe": o save invalidaria de qualquer forma
+        label = (obj.pk, _display_name(kind, obj))
+        cache.add(key, label, TAXONOMY_TIMEOUT)
+    return label
+
+
+def get_count(kind, pk, refresh=False):
+    """
+    Total de posts publicados na categoria/tag/autor. refresh=True ignora o
+    valor em cache e o substitui pelo do banco.
+    """
+    key = _count_key(kind, pk)
+    count = None if refresh else cache.get(key)
+    if not refresh:
+        cache_accessed.send(sender=KINDS[kind][0], name='taxonomy', hit=count is not None)
+    if count is None:
+        _, _, lookup = KINDS[kind]
+        count = (
+            Post.objManager.db_manager(FILL_DB).get_published()
+            .filter(**{lookup: pk}).count()
+        )
+        if refresh:
+            cache.set(key, count, COUNT_TIMEOUT)
+        else:
+            cache.add(key, count, COUNT_TIMEOUT)
+    return count
+
+
+def adjust_count(kind, pk, delta):
+    # Contador que ainda não está em cache será calculado no próximo acesso
+    if pk is None or not delta:
+        return
+    key = _count_key(kind, pk)
+    try:
+        if delta > 0:
+            cache.incr(key, delta)
+        else:
+            cache.decr(key, -delta)
+    except ValueError:
+        pass
+
+
+def invalidate_label(kind, *values):
+    cache.delete_many([_label_key(kind, value) for value in values if value is not None])
+
+
+def invalidate_count(kind, *pks):
+    cache.delete_many([_count_key(kind, pk) for pk in pks if pk is not None])
+
+
+def post_counters(is_published, category_id, created_by_id):
+    # Contadores em que um post entra (as tags são tratadas pelo m2m_changed)
+    if not is_published:
+        return set()
+    return {('category', category_id), ('author', created_by_id)}
@@ -0,0 +1,19 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from blog.assets import CODEMIRROR_BUNDLE, bundle_available, codemirror_cdn_urls
+
+register = template.Library()
+
+
+# Uso: {% codemirror_scripts %}
+# Um único <script> com o bundle (nome com hash, servido por nós) quando o
+# build_codemirror já rodou; senão os arquivos separados do cdnjs.
+@register.simple_tag
+def codemirror_scripts():
+    if bundle_available(CODEMIRROR_BUNDLE):
+        return format_html('<script src="{}"></script>', static(CODEMIRROR_BUNDLE))
+    return format_html_join(
+        '\n', '<script src="{}"></script>', ((url,) for url in codemirror_cdn_urls()),
+    )
@@ -0,0 +1,46 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from utils.images import (
+    DERIVATIVE_WIDTHS, derivative_formats, derivative_name, original_format,
+)
+
+register = template.Library()
+
+
+def _srcset(image, image_format):
+    return ', '.join(
+        f'{image.storage.url(derivative_name(image.name, width, image_format))} {width}w'
+        for width in DERIVATIVE_WIDTHS
+    )
+
+
+# Uso: {% responsive_image post.cover alt="..." sizes="..." css_class="..." %}
+# Gera um <picture> com srcset em AVIF/WebP e no formato original.
+# Enquanto o worker não gerou as versões, cai no <img> simples com a imagem original.
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', css_class='', loading='lazy'):
+    if not image:
+        return ''
+
+    fallback_format = original_format(image.name)
+    smallest = derivative_name(image.name, DERIVATIVE_WIDTHS[0], fallback_format)
+    if not image.storage.exists(smallest):
+        return format_html(
+            '<img class="{}" loading="{}" src="{}" alt="{}">',
+            css_class, loading, image.url, alt,
+        )
+
+    sources = format_html_join(
+        '', '<source type="image/{}" srcset="{}" sizes="{}">',
+        (
+            (image_format, _srcset(image, image_format), sizes)
+            for image_format in derivative_formats()
+        ),
+    )
+    return format_html(
+        '<picture>{}<img class="{}" loading="{}" src="{}" '
+        'srcset="{}" sizes="{}" alt="{}"></picture>',
+        sources, css_class, loading, image.url,
+        _srcset(image, fallback_format), sizes, alt,
+    )
@@ -1,3 +1,926 @@
-from django.test import TestCase
+import gzip
+import json
+import re
+from collections import Counter
+from functools import partial
+import shutil
+import time
+import tempfile
+from pathlib import Path
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from blog.assets import CODEMIRROR_BUNDLE, bundle_available
+from blog.benchmark import compare, route_urls
+from blog.cache import fill_timeout, get_generations
+from blog.models import Category, Page, Post, Tag
+from blog.taxonomy import get_count
+from jobs.models import ImageJob
+from jobs.signals import image_processed
+from project import compression
+from site_setup.models import SiteSetup
+from site_setup.snapshot import get_site_setup, invalidate_site_setup
+from utils import rands
+from utils.html import render_html
+from utils.rands import assign_slugs, slug_candidate
+
+
+class BlogTestCase(TestCase):
+    # Cache e snapshot do site_setup vivem na memória do processo, entre os testes
+    def setUp(self):
+        cache.clear()
+        invalidate_site_setup()
+        self.addCleanup(invalidate_site_setup)
+
+
+class PostDetailViewTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='autor', first_name='Autor', last_name='Teste',
+        )
+        cls.category = Category.objects.create(name='Django')
+        cls.post = Post.objManager.create(
+            title='Post de teste', excerpt='Resumo', content='<p>Conteúdo</p>',
+            is_published=True, created_by=cls.user, category=cls.category,
+        )
+        cls.post.tags.set([
+            Tag.objects.create(name='Python'),
+            Tag.objects.create(name='Web'),
+        ])
+
+    def test_post_detail_renders_author_category_and_tags(self):
+        response = self.client.get(self.post.get_absolute_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Autor')
+        self.assertContains(response, 'Django')
+        self.assertContains(response, 'Python')
+        self.assertContains(response, 'Web')
+
+    def test_post_detail_query_count(self):
+        get_site_setup()  # O snapshot do site_setup fica em cache
+        # post (com autor e categoria via JOIN) + tags
+        with self.assertNumQueries(2):
+            self.client.get(self.post.get_absolute_url())
+
+    def test_codemirror_uses_cdn_until_the_bundle_is_built(self):
+        bundle_available.cache_clear()
+        self.addCleanup(bundle_available.cache_clear)
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, 'cdnjs.cloudflare.com/ajax/libs/codemirror', count=6)
+
+        static_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, static_dir)
+        (static_dir / CODEMIRROR_BUNDLE).parent.mkdir(parents=True)
+        (static_dir / CODEMIRROR_BUNDLE).write_text('/* bundle */')
+        bundle_available.cache_clear()
+        cache.clear()
+
+        with override_settings(STATICFILES_DIRS=[static_dir]):
+            response = self.client.get(self.post.get_absolute_url())
+        self.assertNotContains(response, 'cdnjs.cloudflare.com/ajax/libs/codemirror')
+        self.assertContains(response, f'/static/{CODEMIRROR_BUNDLE}')
+
+    def test_unpublished_post_returns_404(self):
+        self.post.is_published = False
+        self.post.save()
+        response = self.client.get(
+            reverse('blog:post', args=(self.post.slug,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class SearchListViewTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.title_match = Post.objManager.create(
+            title='Aprendendo Django', excerpt='Resumo',
+            content='<p>Texto qualquer</p>', is_published=True,
+        )
+        cls.content_match = Post.objManager.create(
+            title='Outro post', excerpt='Resumo',
+            content='<p>Um pouco de <strong>django</strong> no conteúdo</p>',
+            is_published=True,
+        )
+        cls.unpublished = Post.objManager.create(
+            title='Django rascunho', is_published=False,
+        )
+
+    def search(self, value, **params):
+        return self.client.get(
+            reverse('blog:search'), {'search': value, **params},
+        )
+
+    def test_results_are_ranked_by_relevance(self):
+        response = self.search('django')
+        self.assertEqual(
+            list(response.context['posts']),
+            [self.title_match, self.content_match],
+        )
+
+    def test_search_ignores_accents_and_html(self):
+        response = self.search('conteudo')
+        self.assertEqual(list(response.context['posts']), [self.content_match])
+
+        response = self.search('strong')
+        self.assertEqual(list(response.context['posts']), [])
+
+    def test_post_save_and_delete_update_the_index(self):
+        self.content_match.title = 'Flask'
+        self.content_match.content = '<p>Sem o framework antigo</p>'
+        self.content_match.save()
+        self.assertEqual(
+            list(self.search('django').context['posts']), [self.title_match],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):  # Gerações trocam no commit
+            self.title_match.delete()
+        self.assertEqual(list(self.search('django').context['posts']), [])
+
+    def test_search_paginates_beyond_first_page(self):
+        SiteSetup.objects.create(title='Blog', description='Blog')
+        for i in range(12):
+            Post.objManager.create(
+                title=f'Paginação {i}', is_published=True,
+            )
+
+        first_page = self.search('paginacao')
+        second_page = self.search('paginacao', page=2)
+
+        self.assertEqual(first_page.context['paginator'].count, 12)
+        self.assertEqual(len(first_page.context['posts']), 9)
+        self.assertEqual(len(second_page.context['posts']), 3)
+        self.assertContains(first_page, '?page=2&amp;search=paginacao')
+
+
+class PostCardProjectionTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Django')
+        Post.objManager.create(
+            title='Post com conteúdo grande', excerpt='Resumo do card',
+            content='<p>' + 'x' * 10_000 + '</p>', is_published=True,
+            category=cls.category,
+        )
+
+    def test_lists_do_not_load_post_content(self):
+        for url in (
+            reverse('blog:index'),
+            reverse('blog:category', args=(self.category.slug,)),
+            reverse('blog:search') + '?search=conteúdo',
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertContains(response, 'Resumo do card')
+            self.assertFalse(any(
+                '"blog_post"."content"' in query['sql'] for query in queries
+            ), url)
+
+
+class TaxonomyTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='autor', first_name='Ana')
+        cls.category = Category.objects.create(name='Django')
+        cls.empty_category = Category.objects.create(name='Vazia')
+        cls.python = Tag.objects.create(name='Python')
+        cls.web = Tag.objects.create(name='Web')
+        cls.post = Post.objManager.create(
+            title='Post', is_published=True,
+            category=cls.category, created_by=cls.user,
+        )
+        cls.post.tags.set([cls.python, cls.web])
+
+    def test_titles_come_from_the_requested_taxonomy(self):
+        response = self.client.get(reverse('blog:tag', args=(self.web.slug,)))
+        self.assertEqual(response.context['page_title'], 'Web - Tag - ')
+
+        response = self.client.get(reverse('blog:category', args=(self.category.slug,)))
+        self.assertEqual(response.context['page_title'], 'Django - Categoria - ')
+
+        response = self.client.get(reverse('blog:created_by', args=(self.user.pk,)))
+        self.assertEqual(response.context['page_title'], 'Posts de Ana')
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+    def test_warm_taxonomy_pages_run_only_the_list_query(self):
+        get_site_setup()
+        for url in (
+            reverse('blog:category', args=(self.category.slug,)),
+            reverse('blog:tag', args=(self.python.slug,)),
+            reverse('blog:created_by', args=(self.user.pk,)),
+        ):
+            self.client.get(url)
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+    def test_taxonomy_pages_use_the_counters_as_total(self):
+        get_site_setup()
+        url = reverse('blog:tag', args=(self.python.slug,))
+        self.client.get(url)
+
+        # Salvar um post troca a geração 'lists', mas não o contador
+        Post.objManager.create(title='Outro', is_published=True)
+        with self.assertNumQueries(1):  # Só a listagem, sem o MAX/COUNT
+            response = self.client.get(url)
+        self.assertEqual(response.context['paginator'].count, get_count('tag', self.python.pk))
+
+    def test_empty_or_unknown_taxonomy_returns_404(self):
+        for url in (
+            reverse('blog:category', args=(self.empty_category.slug,)),
+            reverse('blog:category', args=('nao-existe',)),
+            reverse('blog:tag', args=('nao-existe',)),
+            reverse('blog:created_by', args=(999,)),
+        ):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_counters_follow_saves_tags_and_deletes(self):
+        counts = lambda: (  # noqa: E731
+            get_count('category', self.category.pk),
+            get_count('author', self.user.pk),
+            get_count('tag', self.python.pk),
+            get_count('tag', self.web.pk),
+        )
+        self.assertEqual(counts(), (1, 1, 1, 1))
+        commit = partial(self.captureOnCommitCallbacks, execute=True)  # Ajustes rodam no commit
+
+        with commit():
+            other = Post.objManager.create(
+                title='Outro', is_published=True,
+                category=self.category, created_by=self.user,
+            )
+            other.tags.add(self.python)
+        self.assertEqual(counts(), (2, 2, 2, 1))
+
+        with commit():
+            other.tags.remove(self.python)
+            other.tags.add(self.web)
+        self.assertEqual(counts(), (2, 2, 1, 2))
+
+        self.post.is_published = False
+        with commit():
+            self.post.save()
+        self.assertEqual(counts(), (1, 1, 0, 1))
+
+        other.category = self.empty_category
+        with commit():
+            other.save()
+        self.assertEqual(counts(), (0, 1, 0, 1))
+        self.assertEqual(get_count('category', self.empty_category.pk), 1)
+
+        with commit():
+            other.delete()
+        self.assertEqual(counts(), (0, 0, 0, 0))
+        self.assertEqual(get_count('category', self.empty_category.pk), 0)
+
+    def test_rolled_back_save_keeps_the_counters(self):
+        self.assertEqual(get_count('category', self.category.pk), 1)
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                Post.objManager.create(
+                    title='Desfeito', is_published=True, category=self.category,
+                )
+                raise DatabaseError
+        self.assertEqual(get_count('category', self.category.pk), 1)
+
+    def test_stale_zero_count_is_checked_before_404(self):
+        url = reverse('blog:category', args=(self.category.slug,))
+        cache.set(f'blog:count:category:{self.category.pk}', 0)  # Ex.: réplica atrasada
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['paginator'].count, 1)
+        self.assertEqual(get_count('category', self.category.pk), 1)
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+class KeysetPaginationTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Categoria')
+        cls.posts = [
+            Post.objManager.create(
+                title=f'Post {i}', is_published=True, category=cls.category,
+            )
+            for i in range(20)
+        ][::-1]  # Mais recente primeiro, como na listagem
+
+    def get(self, url=None, **params):
+        return self.client.get(url or reverse('blog:index'), params)
+
+    def test_walks_pages_forward_and_backward_with_cursors(self):
+        first = self.get()
+        page_obj = first.context['page_obj']
+        self.assertEqual(list(first.context['posts']), self.posts[:9])
+        self.assertEqual(page_obj.paginator.num_pages, 3)
+
+        second = self.get(page=2, after=self.posts[8].pk)
+        self.assertEqual(list(second.context['posts']), self.posts[9:18])
+
+        third = self.get(page=3, after=self.posts[17].pk)
+        self.assertEqual(list(third.context['posts']), self.posts[18:])
+        self.assertFalse(third.context['page_obj'].has_next())
+
+        back = self.get(page=2, before=self.posts[18].pk)
+        self.assertEqual(list(back.context['posts']), self.posts[9:18])
+        self.assertEqual(back.context['page_obj'].number, 2)
+
+    def test_last_page(self):
+        response = self.get(page=3, last=1)
+        self.assertEqual(list(response.context['posts']), self.posts[18:])
+        self.assertEqual(response.context['page_obj'].number, 3)
+
+    def test_pages_do_not_use_offset_and_reuse_cached_count(self):
+        self.get()
+        with self.assertNumQueries(1):
+            self.get(page=2, after=self.posts[8].pk)
+
+    def test_category_list_uses_keyset(self):
+        url = reverse('blog:category', args=(self.category.slug,))
+        response = self.get(url, page=2, after=self.posts[8].pk)
+        self.assertEqual(list(response.context['posts']), self.posts[9:18])
+
+    def test_invalid_cursor_returns_404(self):
+        self.assertEqual(self.get(after='abc').status_code, 404)
+
+
+class ResponsiveCoverTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=Path(media_root), IMAGE_JOBS_SYNC=True,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload(self):
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 675), 'blue').save(buffer, 'JPEG')
+        return SimpleUploadedFile('capa.jpg', buffer.getvalue(), 'image/jpeg')
+
+    def test_card_renders_srcset_with_modern_formats(self):
+        Post.objManager.create(
+            title='Com capa', is_published=True, cover=self.upload(),
+        )
+        response = self.client.get(reverse('blog:index'))
+
+        self.assertContains(response, '<picture>')
+        self.assertContains(response, '-320w.jpg 320w')
+        self.assertContains(response, 'type="image/webp"')
+
+
+class PageCacheTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = Tag.objects.create(name='Cache')
+        cls.post = Post.objManager.create(
+            title='Primeiro', excerpt='Resumo', is_published=True,
+        )
+        cls.post.tags.add(cls.tag)
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        self.client.get('/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/')
+        self.assertContains(response, 'Primeiro')
+
+        self.client.get(self.post.get_absolute_url())
+        with self.assertNumQueries(0):
+            response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, 'Primeiro')
+
+    def test_page_number_is_part_of_the_key(self):
+        self.client.get('/')
+        with self.assertNumQueries(1):  # posts da página (total em cache)
+            self.client.get('/', {'page': 1})
+
+    def test_publishing_invalidates_lists_and_detail(self):
+        self.client.get('/')
+        self.client.get(self.post.get_absolute_url())
+
+        self.post.title = 'Título novo'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+            Post.objManager.create(title='Segundo', is_published=True)
+
+        response = self.client.get('/')
+        self.assertContains(response, 'Título novo')
+        self.assertContains(response, 'Segundo')
+        self.assertContains(
+            self.client.get(self.post.get_absolute_url()), 'Título novo',
+        )
+
+    def test_generations_change_only_after_commit(self):
+        before = get_generations(['lists', f'post:{self.post.slug}'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+            # Ainda na transação: uma requisição agora leria a linha antiga
+            self.assertEqual(get_generations(['lists', f'post:{self.post.slug}']), before)
+        self.assertNotEqual(get_generations(['lists', f'post:{self.post.slug}']), before)
+
+    @override_settings(DATABASE_REPLICAS=['default'], REPLICA_STICKY_SECONDS=60)
+    def test_fills_after_a_bump_last_only_the_replica_window(self):
+        ten_seconds_ago = [time.time_ns() - 10 * 10**9]
+        self.assertEqual(fill_timeout(300, ten_seconds_ago), 50)
+        self.assertEqual(fill_timeout(30, ten_seconds_ago), 30)
+        self.assertEqual(fill_timeout(300, [time.time_ns() - 61 * 10**9]), 300)
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(fill_timeout(300, ten_seconds_ago), 300)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        response = self.client.get('/')  # Réplica pode não ter o save ainda
+        self.assertLessEqual(response.context['card_cache_timeout'], 60)
+
+    def test_tag_changes_invalidate_posts_using_it(self):
+        self.client.get(self.post.get_absolute_url())
+        self.tag.name = 'Renomeada'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.save()
+        self.assertContains(
+            self.client.get(self.post.get_absolute_url()), 'Renomeada',
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.tags.remove(self.tag)
+        self.assertNotContains(
+            self.client.get(self.post.get_absolute_url()), 'Renomeada',
+        )
+
+    def test_deleting_tag_or_category_invalidates_posts_using_it(self):
+        category = Category.objects.create(name='Apagada')
+        self.post.category = category
+        self.post.save()
+        url = self.post.get_absolute_url()
+        response = self.client.get(url)
+        self.assertContains(response, 'Cache')
+        self.assertContains(response, 'Apagada')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.delete()
+            category.delete()
+        fresh = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotContains(fresh, 'Cache')
+        self.assertNotContains(fresh, 'Apagada')
+
+    def test_cached_pages_are_compressed_only_once(self):
+        with mock.patch(
+            'project.compression.compress', wraps=compression.compress,
+        ) as compress:
+            for _ in range(3):
+                response = self.client.get(
+                    reverse('blog:index'), HTTP_ACCEPT_ENCODING='gzip',
+                )
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertEqual(
+                    gzip.decompress(response.content).count(b'<article'), 1,
+                )
+
+        # Uma vez por codificação disponível, ao guardar no cache
+        self.assertEqual(compress.call_count, len(compression.available_encodings()))
+
+    def test_logged_in_users_skip_the_cache(self):
+        user = User.objects.create_user(username='admin', password='senha')
+        self.client.get('/')
+        self.client.force_login(
+            user, backend='django.contrib.auth.backends.ModelBackend',
+        )
+        with self.assertNumQueries(2):  # usuário + posts (sessão e total em cache)
+            self.client.get('/')
+
+
+class ConditionalGetTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = Post.objManager.create(title='Post', is_published=True)
+        cls.page = Page.objects.create(
+            title='Sobre', slug='sobre', content='Página', is_published=True,
+        )
+
+    def assert_not_modified(self, url, response):
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        not_modified = self.client.get(
+            url, headers={'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+    def test_views_answer_304_without_rendering(self):
+        for url in ('/', self.post.get_absolute_url(), self.page.get_absolute_url()):
+            with self.subTest(url=url):
+                self.assert_not_modified(url, self.client.get(url))
+
+        response = self.client.get('/')
+        with self.assertNumQueries(0):  # MAX/COUNT em cache, sem renderizar
+            self.client.get('/', headers={'If-None-Match': response['ETag']})
+
+    def test_cached_page_answers_304_without_queries(self):
+        response = self.client.get('/')
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                '/', headers={'If-None-Match': response['ETag']},
+            )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_if_modified_since(self):
+        response = self.client.get(self.post.get_absolute_url())
+        not_modified = self.client.get(
+            self.post.get_absolute_url(),
+            headers={'If-Modified-Since': response['Last-Modified']},
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+    def test_if_modified_since_sees_generation_changes(self):
+        tag = Tag.objects.create(name='Antiga')
+        self.post.tags.add(tag)
+        newest = Post.objManager.create(title='Mais novo', is_published=True)
+        post_url = self.post.get_absolute_url()
+        since = {
+            url: self.client.get(url)['Last-Modified'] for url in ('/', post_url)
+        }
+
+        # Trocas no segundo seguinte (o Last-Modified tem resolução de segundos)
+        later = time.time_ns() + 2 * 10**9
+        with mock.patch('blog.cache.time.time_ns', return_value=later), \
+                self.captureOnCommitCallbacks(execute=True):
+            tag.name = 'Renomeada'
+            tag.save()
+            newest.delete()  # MAX(updated_at) da listagem volta no tempo
+
+        for url, last_modified in since.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, headers={'If-Modified-Since': last_modified})
+                self.assertEqual(response.status_code, 200)
+        self.assertContains(self.client.get(post_url), 'Renomeada')
+
+    def test_changes_produce_a_new_etag(self):
+        etag = self.client.get('/')['ETag']
+        self.post.is_published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+
+        response = self.client.get('/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class RenderedContentTests(BlogTestCase):
+    def test_render_html_removes_scripts_and_unsafe_attributes(self):
+        html = render_html(
+            '<p onclick="alert(1)">Oi<script>alert(2)</script></p>'
+            '<a href="javascript:alert(3)">link</a>'
+            '<a href="https://example.com" target="_blank">fora</a>'
+        )
+        self.assertNotIn('script', html)
+        self.assertNotIn('alert', html)
+        self.assertIn('<p>Oi</p>', html)
+        self.assertIn('<a>link</a>', html)
+        self.assertIn('rel="noopener noreferrer"', html)
+
+    def test_render_html_adds_anchors_and_lazy_images(self):
+        html = render_html(
+            '<h2>Introdução</h2><h2>Introdução</h2><img src="/media/x.jpg">'
+        )
+        self.assertIn('<h2 id="introducao">', html)
+        self.assertIn('<h2 id="introducao-2">', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('decoding="async"', html)
+
+    def test_detail_views_render_saved_html(self):
+        post = Post.objManager.create(
+            title='Post', is_published=True, excerpt='<b>Resumo</b>',
+            content='<p>Texto<script>x()</script></p>',
+        )
+        page = Page.objects.create(
+            title='Sobre', slug='sobre', content='<p>Página</p>', is_published=True,
+        )
+        self.assertEqual(post.content_html, '<p>Texto</p>')
+
+        response = self.client.get(post.get_absolute_url())
+        self.assertContains(response, '<b>Resumo</b>')
+        self.assertContains(response, '<p>Texto</p>')
+        self.assertNotContains(response, 'x()')
+        self.assertContains(self.client.get(page.get_absolute_url()), '<p>Página</p>')
+
+    def test_update_fields_also_saves_rendered_html(self):
+        post = Post.objManager.create(title='Post', content='<p>Antes</p>')
+        post.content = '<p>Depois</p>'
+        post.save(update_fields=['content'])
+
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, '<p>Depois</p>')
+
+    def test_only_content_image_derivatives_rerender_posts(self):
+        path = 'django-summernote/2024-01-01/foto.jpg'
+        post = Post.objManager.create(title='Post', content=f'<img src="/media/{path}">')
+        send = partial(image_processed.send, sender=ImageJob, job=None)
+
+        with self.assertNumQueries(0):
+            send(path='posts/2024/01/capa.jpg', kind=ImageJob.Kind.RESIZE)
+            send(path=path, kind=ImageJob.Kind.RESIZE)
+
+        with mock.patch('blog.signals.render_rows', return_value=0) as render_rows:
+            send(path=path, kind=ImageJob.Kind.DERIVATIVES)
+        self.assertEqual(list(render_rows.call_args_list[0].kwargs['queryset']), [post])
+
+    def test_render_content_command_updates_stale_rows(self):
+        post = Post.objManager.create(title='Post', content='<h3>Seção</h3>')
+        Post.objManager.filter(pk=post.pk).update(content_html='')
+
+        call_command('render_content', batch_size=1, stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, '<h3 id="secao">Seção</h3>')
+
+
+class SlugAllocationTests(BlogTestCase):
+    def test_same_title_gets_distinct_deterministic_slugs(self):
+        first = Post.objManager.create(title='Mesmo título')
+        second = Post.objManager.create(title='Mesmo título')
+
+        self.assertEqual(first.slug, slug_candidate('Mesmo título', 0, 4, 255))
+        self.assertEqual(second.slug, slug_candidate('Mesmo título', 1, 4, 255))
+
+    def test_skips_slugs_already_taken(self):
+        Tag.objects.create(name='Outra', slug=slug_candidate('Python', 0, 5, 255))
+        tag = Tag.objects.create(name='Python')
+        self.assertEqual(tag.slug, slug_candidate('Python', 1, 5, 255))
+
+    def test_page_without_slug_gets_one(self):
+        page = Page.objects.create(title='Sobre nós', content='Texto')
+        self.assertTrue(page.slug.startswith('sobre-nos'))
+        self.assertEqual(page.title, 'Sobre nós')
+
+    def test_save_retries_when_slug_is_taken_concurrently(self):
+        tag = Tag(name='Django')
+        taken = slug_candidate('Django', 0, 5, 255)
+        original = rands.unique_slug
+        calls = []
+
+        # Simula outra requisição gravando o slug entre a checagem e o INSERT
+        def racing_unique_slug(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                Tag.objects.create(name='Concorrente', slug=taken)
+                return taken
+            return original(*args, **kwargs)
+
+        with mock.patch('utils.rands.unique_slug', racing_unique_slug):
+            tag.save()
+        self.assertEqual(tag.slug, slug_candidate('Django', 1, 5, 255))
+
+    def test_assign_slugs_checks_the_whole_batch_at_once(self):
+        Post.objManager.create(title='Importado 1')
+        posts = [Post(title=f'Importado {number % 100}') for number in range(1000)]
+
+        # 10 posts por título: 1 + 8 + 1 candidatos por título, uma query por rodada
+        with self.assertNumQueries(3):
+            assign_slugs(posts, 'title', 4)
+        slugs = [post.slug for post in posts]
+        self.assertEqual(len(set(slugs)), 1000)
+        self.assertNotIn(Post.objManager.get().slug, slugs)
+
+
+class TransferTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write(self, name, text):
+        path = self.tmp / name
+        path.write_text(text, encoding='utf-8')
+        return str(path)
+
+    def test_export_and_import_round_trip(self):
+        user = User.objects.create_user(username='autor')
+        post = Post.objManager.create(
+            title='Original', excerpt='Resumo', content='<p>Texto</p>',
+            is_published=True, created_by=user,
+            category=Category.objects.create(name='Django'),
+        )
+        post.tags.set([Tag.objects.create(name='Python')])
+        path = str(self.tmp / 'posts.jsonl')
+        call_command('export_posts', path, stdout=StringIO())
+
+        Post.objManager.all().delete()
+        call_command('import_posts', path, stdout=StringIO())
+
+        imported = Post.objManager.get(slug=post.slug)
+        self.assertEqual(imported.content_html, '<p>Texto</p>')
+        self.assertEqual(imported.created_by, user)
+        self.assertEqual(imported.category.name, 'Django')
+        self.assertEqual([tag.name for tag in imported.tags.all()], ['Python'])
+        self.assertEqual(Category.objects.count(), 1)
+
+        response = self.client.get(reverse('blog:search'), {'search': 'original'})
+        self.assertEqual(list(response.context['posts']), [imported])
+
+    def test_csv_import_uses_a_fixed_number_of_queries(self):
+        rows = ''.join(
+            f'Post {number},<p>Texto {number}</p>,1,django,Django,python|web,posts/capa{number}.jpg\n'
+            for number in range(200)
+        )
+        path = self.write('posts.csv', 'title,content,is_published,category,category_name,tags,cover\n' + rows)
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_posts', path, stdout=StringIO())
+        self.assertLess(len(queries), 30)  # Não cresce com o número de posts
+
+        self.assertEqual(Post.objManager.filter(is_published=True).count(), 200)
+        self.assertEqual(Tag.objects.get(slug='web').post_set.count(), 200)
+        self.assertEqual(ImageJob.objects.filter(path='posts/capa7.jpg').count(), 2)
+        self.assertEqual(get_count('category', Category.objects.get().pk), 200)
+
+    def test_existing_slug_is_updated(self):
+        post = Post.objManager.create(title='Antigo', is_published=True)
+        post.tags.set([Tag.objects.create(name='Velha')])
+        path = self.write('posts.jsonl', json.dumps({
+            'slug': post.slug, 'title': 'Novo', 'is_published': True,
+            'tags': [{'slug': 'nova', 'name': 'Nova'}],
+        }) + '\n')
+        self.assertContains(self.client.get('/'), 'Antigo')  # Card em cache
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_posts', path, stdout=StringIO())
+        response = self.client.get('/')
+        self.assertContains(response, 'Novo')
+        self.assertNotContains(response, 'Antigo')
+
+        post.refresh_from_db()
+        self.assertEqual(Post.objManager.count(), 1)
+        self.assertEqual(post.title, 'Novo')
+        self.assertEqual([tag.name for tag in post.tags.all()], ['Nova'])
+
+    def test_invalid_record_reports_the_batch(self):
+        path = self.write('posts.jsonl', json.dumps({'title': 'X', 'created_at': 'ontem'}) + '\n')
+        with self.assertRaisesMessage(CommandError, 'registro 1'):
+            call_command('import_posts', path, stdout=StringIO())
+
+
+class BenchmarkTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        settings_override = override_settings(MEDIA_ROOT=self.tmp)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_seed_and_benchmark_every_route(self):
+        call_command(
+            'seed_blog', posts=30, tags=5, categories=2, users=2, pages=1, images=1,
+            stdout=StringIO(),
+        )
+        self.assertEqual(Post.objManager.count(), 30)
+        self.assertTrue((self.tmp / 'posts/bench/bench-0.jpg').exists())
+        self.assertTrue(ImageJob.objects.filter(path='posts/bench/bench-0.jpg').exists())
+
+        output = self.tmp / 'bench.json'
+        call_command('benchmark', iterations=2, output=str(output), stdout=StringIO())
+        report = json.loads(output.read_text())
+
+        self.assertEqual(set(report['client']), set(route_urls()))
+        for name, result in report['client'].items():
+            with self.subTest(route=name):
+                self.assertEqual(result['requests'], 2)
+                self.assertIn('p99_ms', result)
+                self.assertGreaterEqual(result['queries'], 0)
+
+        # Baseline com menos queries na home: o benchmark falha
+        report['client']['index']['queries'] = -1
+        baseline = self.tmp / 'baseline.json'
+        baseline.write_text(json.dumps(report))
+        with self.assertRaisesMessage(CommandError, 'client index'):
+            call_command(
+                'benchmark', iterations=2, baseline=str(baseline), tolerance=100,
+                stdout=StringIO(),
+            )
+
+    def test_compare_fails_past_tolerance(self):
+        base = {'client': {'index': {
+            'url': '/', 'queries': 4, 'requests': 10, 'rps': 100.0, 'p50_ms': 10.0, 'p99_ms': 20.0,
+        }}}
+
+        def run(**changes):
+            return compare({'client': {'index': {**base['client']['index'], **changes}}}, base)
+
+        self.assertEqual(run(p50_ms=12.0, rps=80.0), [])
+        self.assertEqual(len(run(p50_ms=13.0)), 1)
+        self.assertEqual(len(run(p99_ms=31.0)), 1)
+        self.assertEqual(len(run(rps=70.0)), 1)
+        self.assertEqual(len(run(queries=5)), 1)
+        self.assertEqual(compare({'client': {}}, base), ['client index: rota não medida'])
+
+        # Baseline versionado: só queries, sem tempos para comparar
+        queries = {'client': {'index': {'url': '/', 'queries': 4}}}
+        slow = {'client': {'index': {**base['client']['index'], 'p50_ms': 99.0}}}
+        self.assertEqual(compare(slow, queries), [])
+        self.assertEqual(len(compare({'client': {'index': {'queries': 5}}}, queries)), 1)
+
+    def test_check_against_committed_baseline(self):
+        call_command(
+            'seed_blog', posts=12, tags=3, categories=2, users=2, pages=1, images=0,
+            stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command('benchmark', iterations=2, warmup=0, check=True, stdout=out)
+        self.assertIn('Sem regressões', out.getvalue())
+
+    def test_benchmark_requires_data(self):
+        with self.assertRaisesMessage(CommandError, 'seed_blog'):
+            call_command('benchmark', stdout=StringIO())
+
+    def test_explain_seeds_with_seed_blog(self):
+        output = StringIO()
+        call_command('explain_post_queries', seed=20, repeat=1, stdout=output)
+
+        self.assertIn('Dados de benchmark gerados', output.getvalue())
+        self.assertIn('consulta(s) para revisar', output.getvalue())
+        post = Post.objManager.filter(is_published=True).first()
+        self.assertTrue(post.content_html)
+        response = self.client.get(reverse('blog:search'), {'search': 'django'})
+        self.assertTrue(response.context['posts'])  # Posts entraram no índice de busca
+
+
+
+# Máximo de queries por rota, com todos os caches frios (primeira requisição
+# depois de um deploy ou de uma alteração no admin). Com o cache quente as
+# listagens fazem 1 query.
+QUERY_BUDGETS = {
+    'blog:index': 4,  # MAX/COUNT + site_setup + links do menu + posts
+    'blog:post': 4,  # site_setup + links + post (autor e categoria no JOIN) + tags
+    'blog:page': 3,
+    'blog:created_by': 5,  # + autor (nome) e contador de posts, que substitui o MAX/COUNT
+    'blog:category': 5,
+    'blog:tag': 5,
+    'blog:search': 5,
+}
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)  # Mede a view, não o cache de páginas
+class QueryBudgetTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'seed_blog', posts=40, tags=5, categories=3, users=3, pages=1, images=0,
+            stdout=StringIO(),
+        )
+
+    def assert_query_budget(self, budget, label, func):
+        cache.clear()
+        invalidate_site_setup()
+        with CaptureQueriesContext(connection) as captured:
+            result = func()
+        queries = [query['sql'] for query in captured.captured_queries]
+
+        # Mesma query repetida com outros valores = N+1 (ex.: post.created_by no loop)
+        shapes = Counter(re.sub(r"'[^']*'|\b\d+\b", '?', sql) for sql in queries)
+        repeated = [shape for shape, count in shapes.items() if count > 1]
+        if repeated or len(queries) > budget:
+            listing = '\n'.join(f'{number}. {sql}' for number, sql in enumerate(queries, 1))
+            reason = 'queries repetidas (N+1)' if repeated else f'orçamento de {budget}'
+            self.fail(f'{label}: {len(queries)} queries, {reason}:\n{listing}')
+        return result
+
+    def test_public_routes_stay_within_budget(self):
+        urls = route_urls()
+        self.assertEqual(
+            {f'blog:{name}' for name in urls if ':' not in name}, set(QUERY_BUDGETS),
+        )
+        for name, url in urls.items():
+            route = 'blog:' + name.split(':')[0]
+            with self.subTest(route=route, url=url):
+                response = self.assert_query_budget(
+                    QUERY_BUDGETS[route], url, lambda: self.client.get(url),
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_lazy_relation_in_a_loop_fails_with_the_sql(self):
+        def cards_with_author():
+            posts = Post.objManager.get_published_cards()[:5]
+            return [post.created_by for post in posts]  # Fora do CARD_FIELDS
+
+        with self.assertRaises(AssertionError) as raised:
+            self.assert_query_budget(10, 'cards', cards_with_author)
+        self.assertIn('N+1', str(raised.exception))
+        self.assertIn('FROM "blog_post"', str(raised.exception))
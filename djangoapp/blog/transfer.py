@@ -0,0 +1,306 @@
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.cache import invalidate, invalidate_post_card
+from blog.models import Category, Post, Tag
+from blog.search import get_search_backend
+from blog.taxonomy import invalidate_count
+from jobs.models import ImageJob
+from utils.rands import assign_slugs
+
+# Importação/exportação de posts em massa (comandos import_posts e export_posts).
+# JSONL: um objeto por linha. CSV: as mesmas colunas, com as tags separadas por "|".
+FIELDS = (
+    'slug', 'title', 'excerpt', 'content', 'is_published', 'cover',
+    'cover_in_post_content', 'created_at', 'created_by', 'category',
+    'category_name', 'tags',
+)
+FORMATS = ('jsonl', 'csv')
+TAG_SEPARATOR = '|'
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'sim', 's'}
+
+# Colunas gravadas pelo bulk_create/bulk_update (o registro substitui o post inteiro)
+POST_FIELDS = (
+    'title', 'excerpt', 'content', 'excerpt_html', 'content_html',
+    'is_published', 'cover', 'cover_in_post_content', 'created_at',
+    'created_by', 'category', 'updated_at',
+)
+
+
+def guess_format(path, default='jsonl'):
+    suffix = str(path).rsplit('.', 1)[-1].lower()
+    return suffix if suffix in FORMATS else default
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# Leitura/escrita
+def read_records(file, file_format):
+    if file_format == 'csv':
+        for row in csv.DictReader(file):
+            row['tags'] = [slug for slug in (row.get('tags') or '').split(TAG_SEPARATOR) if slug]
+            yield row
+        return
+
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def write_records(file, records, file_format):
+    if file_format == 'csv':
+        writer = csv.DictWriter(file, FIELDS)
+        writer.writeheader()
+        for record in records:
+            category = record['category'] or {}
+            writer.writerow({
+                **record,
+                'category': category.get('slug', ''),
+                'category_name': category.get('name', ''),
+                'tags': TAG_SEPARATOR.join(tag['slug'] for tag in record['tags']),
+            })
+        return
+
+    for record in records:
+        file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def post_record(post):
+    def taxonomy(obj):
+        return {'slug': obj.slug, 'name': obj.name}
+
+    return {
+        'slug': post.slug,
+        'title': post.title,
+        'excerpt': post.excerpt,
+        'content': post.content,
+        'is_published': post.is_published,
+        'cover': post.cover.name or '',
+        'cover_in_post_content': post.cover_in_post_content,
+        'created_at': post.created_at.isoformat() if post.created_at else '',
+        'created_by': post.created_by.username if post.created_by else '',
+        'category': taxonomy(post.category) if post.category else None,
+        'tags': [taxonomy(tag) for tag in post.tags.all()],
+    }
+
+
+def export_records(queryset=None, chunk_size=500):
+    """Registros dos posts em ordem de pk, lidos em blocos (memória constante)."""
+    if queryset is None:
+        queryset = Post.objManager.all()
+    queryset = (
+        queryset.order_by('pk')
+        .select_related('created_by', 'category')
+        .prefetch_related('tags')
+        .defer('excerpt_html', 'content_html')  # Regerados na importação
+    )
+    for post in queryset.iterator(chunk_size=chunk_size):
+        yield post_record(post)
+
+
+# Conversão dos valores do registro
+def parse_bool(value, default=False):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def parse_created_at(value):
+    if not value:
+        return None
+    created_at = parse_datetime(value)
+    if created_at is None:
+        raise ValueError(f'Data inválida: {value!r}')
+    if timezone.is_naive(created_at):
+        created_at = timezone.make_aware(created_at)
+    return created_at
+
+
+def taxonomy_ref(value, name=''):
+    # "django" ou {"slug": "django", "name": "Django"} -> (slug, nome)
+    if isinstance(value, dict):
+        return value.get('slug') or None, value.get('name') or ''
+    return value or None, name or ''
+
+
+def record_category(record):
+    slug, name = taxonomy_ref(record.get('category'), record.get('category_name'))
+    return (slug, name) if slug else None
+
+
+def record_tags(record):
+    refs = (taxonomy_ref(value) for value in record.get('tags') or [])
+    return [(slug, name) for slug, name in refs if slug]
+
+
+class PostImporter:
+    """
+    Cria/atualiza posts em lotes com bulk_create/bulk_update, sem os signals
+    e o save() de cada post: categorias, tags e autores são resolvidos em uma
+    query por lote, os slugs em lote (utils.rands.assign_slugs), o índice de
+    busca com index_rows e as imagens vão para a fila (ImageJob).
+
+    Posts com slug já existente são atualizados; os demais, criados.
+    Cada lote é uma transação.
+    """
+
+    def __init__(self, using=None, batch_size=500, images=True):
+        self.using = using or router.db_for_write(Post)
+        self.batch_size = batch_size
+        self.images = images
+        # slug/username -> pk, para não repetir a busca em cada lote
+        self.known = {'category': {}, 'tag': {}, 'author': {}}
+        # Contadores (blog.taxonomy) que mudaram
+        self.touched = {'category': set(), 'tag': set(), 'author': set()}
+        self.created = self.updated = self.processed = 0
+
+    def run(self, records):
+        for batch in batched(records, self.batch_size):
+            with transaction.atomic(using=self.using):
+                self.import_batch(batch)
+            self.processed += len(batch)
+        self.finish()
+        return self.created, self.updated
+
+    def import_batch(self, records):
+        self.resolve('category', Category, filter(None, map(record_category, records)))
+        self.resolve('tag', Tag, (ref for record in records for ref in record_tags(record)))
+        self.resolve_authors({record.get('created_by') for record in records} - {None, ''})
+
+        slugs = {record['slug'] for record in records if record.get('slug')}
+        existing = {
+            slug: (pk, category_id, created_by_id)
+            for slug, pk, category_id, created_by_id in
+            Post.objManager.using(self.using).filter(slug__in=slugs)
+            .values_list('slug', 'pk', 'category_id', 'created_by_id')
+        }
+        for _, category_id, created_by_id in existing.values():
+            self.touched['category'].add(category_id)
+            self.touched['author'].add(created_by_id)
+
+        now = timezone.now()
+        posts = {}  # Slug repetido no lote: vale o último registro
+        new, changed = [], []
+        for record in records:
+            slug = record.get('slug') or ''
+            post = posts.get(slug) if slug else None
+            if post is None:
+                post = Post(pk=existing.get(slug, (None,))[0], slug=slug)
+                (changed if post.pk else new).append(post)
+                if slug:
+                    posts[slug] = post
+            self.fill(post, record, now)
+
+        assign_slugs(new, 'title', 4, using=self.using)
+        Post.objManager.using(self.using).bulk_create(new)
+        if new and new[0].pk is None:  # Banco sem RETURNING no INSERT em lote
+            pks = dict(
+                Post.objManager.using(self.using)
+                .filter(slug__in=[post.slug for post in new]).values_list('slug', 'pk')
+            )
+            for post in new:
+                post.pk = pks[post.slug]
+        Post.objManager.using(self.using).bulk_update(changed, POST_FIELDS)
+
+        self.link_tags(new, changed)
+        self.after_write(new + changed)
+        if changed:  # Cards em cache (pelo pk) dos posts atualizados, depois do commit do lote
+            pks = [post.pk for post in changed]
+            transaction.on_commit(lambda: invalidate_post_card(*pks), using=self.using)
+        self.created += len(new)
+        self.updated += len(changed)
+
+    def fill(self, post, record, now):
+        post.title = record.get('title') or ''
+        post.excerpt = record.get('excerpt') or ''
+        post.content = record.get('content') or ''
+        post.is_published = parse_bool(record.get('is_published'))
+        post.cover = record.get('cover') or ''
+        post.cover_in_post_content = parse_bool(record.get('cover_in_post_content'), True)
+        post.created_at = parse_created_at(record.get('created_at')) or now
+        post.created_by_id = self.known['author'].get(record.get('created_by'))
+        category = record_category(record)
+        post.category_id = self.known['category'][category[0]] if category else None
+        post.updated_at = now
+        post.render_content()
+        post._tag_pks = {self.known['tag'][slug] for slug, _ in record_tags(record)}
+
+        self.touched['category'].add(post.category_id)
+        self.touched['author'].add(post.created_by_id)
+        self.touched['tag'].update(post._tag_pks)
+
+    def resolve(self, kind, model, refs):
+        known = self.known[kind]
+        missing = {}
+        for slug, name in refs:
+            if slug not in known:
+                missing.setdefault(slug, name)
+        if not missing:
+            return
+
+        objects = model.objects.using(self.using)
+        known.update(objects.filter(slug__in=missing).values_list('slug', 'pk'))
+        to_create = [
+            model(slug=slug, name=name or slug.replace('-', ' ').capitalize())
+            for slug, name in missing.items() if slug not in known
+        ]
+        if to_create:
+            objects.bulk_create(to_create, ignore_conflicts=True)
+            known.update(
+                objects.filter(slug__in=[obj.slug for obj in to_create])
+                .values_list('slug', 'pk')
+            )
+
+    def resolve_authors(self, usernames):
+        # Autores não são criados: username desconhecido fica sem autor
+        known = self.known['author']
+        missing = [username for username in usernames if username not in known]
+        if not missing:
+            return
+        known.update(dict.fromkeys(missing))
+        known.update(
+            User.objects.using(self.using).filter(username__in=missing)
+            .values_list('username', 'pk')
+        )
+
+    def link_tags(self, new, changed):
+        through = Post.tags.through
+        links = through.objects.using(self.using)
+        if changed:  # As tags do registro substituem as antigas
+            old = links.filter(post_id__in=[post.pk for post in changed])
+            self.touched['tag'].update(old.values_list('tag_id', flat=True))
+            old.delete()
+        links.bulk_create(
+            [
+                through(post_id=post.pk, tag_id=tag_pk)
+                for post in new + changed for tag_pk in post._tag_pks
+            ],
+            ignore_conflicts=True,
+        )
+
+    def after_write(self, posts):
+        get_search_backend(self.using).index_rows([
+            (post.pk, post.title, post.excerpt, post.content) for post in posts
+        ])
+        if self.images:
+            # Processadas depois, pelo process_image_jobs (mesmos parâmetros do Post.save)
+            ImageJob.bulk_enqueue({post.cover.name for post in posts if post.cover}, 900, True, 50)
+
+    def finish(self):
+        if not (self.created or self.updated):
+            return
+        for kind, pks in self.touched.items():
+            invalidate_count(kind, *pks)
+        invalidate('site')
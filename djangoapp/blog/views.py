@@ -3,26 +3,82 @@ from django.db.models.query import QuerySet
 from django.shortcuts import redirect, render
 from django.core.paginator import Paginator
 from blog.models import Post, Page
+from blog.search import get_search_backend
+from blog.pagination import CountedPaginator, KeysetPaginator
+from blog.cache import CachedPageMixin, get_generations, page_cache_timeout
+from blog.conditional import DetailConditionalGetMixin, ListConditionalGetMixin
+from blog.taxonomy import get_count, get_label
+from django.conf import settings
+from django.db import router
 from django.db.models import Q
-from django.contrib.auth.models import User
 from django.http import Http404, HttpRequest, HttpResponse
 from django.views.generic import ListView, DetailView
 from pprint import pprint
+from urllib.parse import urlencode
 
 PER_PAGE = 9
 
 # Essa classe é a nossa HOME do site
-class PostListView(ListView):
+# CachedPageMixin: visitantes anônimos recebem o HTML do cache (ver blog/cache.py)
+# ListConditionalGetMixin: responde 304 quando nenhum post visível mudou (ver blog/conditional.py)
+class PostListView(ListConditionalGetMixin, CachedPageMixin, ListView):
     model = Post
     template_name = 'blog/pages/index.html'
     context_object_name = 'posts'  # Nome da variável que será acessível no template, lista de objetos
     ordering = '-pk',  # Primary Key do OBJETO POST
     paginate_by = PER_PAGE  # Quantos elementos por página
-    queryset = Post.objManager.get_published()  # Traz somente os objetos do POST que estão marcados no is_published
+    queryset = Post.objManager.get_published_cards()  # Traz somente os objetos do POST que estão marcados no is_published (só as colunas do card)
+    # Paginação por cursor (pk) em vez de OFFSET. None -> usa settings.BLOG_KEYSET_PAGINATION
+    keyset_pagination = None
 
     # def get_queryset(self):
     #     return self.queryset
 
+    def uses_keyset_pagination(self):
+        if self.keyset_pagination is None:
+            return getattr(settings, 'BLOG_KEYSET_PAGINATION', False)
+        return self.keyset_pagination
+
+    # Com keyset, a página vem dos parâmetros ?after= / ?before= / ?last= da URL
+    # e o total de páginas usa um COUNT em cache.
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, count=self.visible_count)
+        page = paginator.page_from_request(self.request)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    # O total já veio junto com o ETag (ListConditionalGetMixin), sem outro COUNT(*)
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return CountedPaginator(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count=self.visible_count, **kwargs,
+        )
+
+    # O total já é conhecido (visible_count): evita o EXISTS extra que o ListView
+    # faz quando allow_empty = False.
+    def get_allow_empty(self):
+        if self.allow_empty or self.visible_count is None:
+            return self.allow_empty
+        if not self.visible_count:
+            raise Http404('Nenhum post encontrado')
+        return True
+
+    # Total das listagens por autor/categoria/tag: contador de blog.taxonomy.
+    # Um 0 em cache pode estar defasado, então é confirmado no banco antes do
+    # 404 (e do paginator vazio).
+    def taxonomy_count(self, kind, pk):
+        count = get_count(kind, pk)
+        if not count and self.get_queryset().exists():
+            count = get_count(kind, pk, refresh=True)
+        return count
+
+    # Todas as listagens (home, autor, categoria, tag e busca) dependem de qualquer post
+    def get_cache_namespaces(self):
+        return ['site', 'lists']
+
     # **kwargs -> deixa explicito que ao CHAMAR esse metódo, PODE SER PASSADO argumentos, ou seja, este método ACEITA argumentos ao ser chamado. 
     #  Método para mexer no contexto
     def get_context_data(self, **kwargs):
@@ -30,7 +86,9 @@ class PostListView(ListView):
         
         #  Define variáveis (chave) que ficarão acessíveis no template com seus devidos valores (Home - )
         context.update({
-            'page_title': 'Home - '
+            'page_title': 'Home - ',
+            # Usado no {% cache %} do _post_card.html (curto logo depois de uma troca, ver fill_timeout)
+            'card_cache_timeout': page_cache_timeout(get_generations(self.get_cache_namespaces())),
         })
 
         return context
@@ -43,14 +101,9 @@ class CreatedByListView(PostListView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data()  # ctx -> chama o método de contexto da superclass, no caso ListView da classe PostLisView
 
-        # Como executamoso o DISPATCH e depois o GET(que faz as ações ali embaixo, pegando o usuario no BD com base na author_pk passada como parametro)
-        # aqui então temos acesso à self_temp_context contexto que retorna esses dados do banco de dados(LÓGICA SENDO FEITA NO MÉTODO GET ABAIXO)
-        user = self._temp_context['user']
-        user_full_name = user.username
-
-        if user.first_name:
-            user_full_name = f'{user.first_name} {user.last_name}'
-        page_title = 'Posts de ' + user_full_name
+        # Como executamoso o DISPATCH e depois o GET(que faz as ações ali embaixo, pegando o nome do autor com base na author_pk passada como parametro)
+        # aqui então temos acesso à self_temp_context contexto que retorna esses dados (LÓGICA SENDO FEITA NO MÉTODO GET ABAIXO)
+        page_title = 'Posts de ' + self._temp_context['author_name']
 
         # Estamos atualizando a variavel context_object_name da classe PostLisView,
         # Neste caso, estamos definindo um contexto para essa classe aqui. ( CreatedByListView ). Diferente da classe herdada.
@@ -65,13 +118,17 @@ class CreatedByListView(PostListView):
     # Manipulando a QUERY
     def get_queryset(self) -> QuerySet[Any]:
         qs = super().get_queryset()
-        qs = qs.filter(created_by__pk=self._temp_context['user'].pk)
+        qs = qs.filter(created_by_id=self._temp_context['author_pk'])
 
         # Retorna o conjunto de consultas filtrado. 
         # Isso afetará a renderização dos objetos na sua visualização, 
         # garantindo que apenas os objetos associados ao usuário atual sejam exibidos.
         return qs
 
+    # Total de posts do autor vem do contador (blog.taxonomy), como nas categorias/tags
+    def get_known_count(self):
+        return self.taxonomy_count('author', self._temp_context['author_pk'])
+
     #  Nesta classe quando é executada, primeiro executa o método DISPATCH da classe PAI, e logo em seguida o GET
     #  então definimos este método get abaixo para o código ficar mais performático e escrito melhor.
     def get(self, request, *args, **kwargs):
@@ -80,43 +137,58 @@ class CreatedByListView(PostListView):
         # ListView temos acesso com self.kwargs pois estamos herdando ela de PostListView.
         # Com isso obtemos chave-valor do parametro da URL de requisição e temos acesso à esses valores em self.kwargs  
         author_pk = self.kwargs.get('author_pk')
-        user = User.objects.filter(pk=author_pk).first()
+        # (pk, nome) do autor vem do cache (blog.taxonomy), sem query a cada página
+        label = get_label('author', author_pk)
 
-        if user is None:
+        if label is None:
             raise Http404()
         self._temp_context.update({
-            'author_pk': author_pk,  # Retornado pelo get(classe Atual) no kwargs(pegado na classe pai - ListView)
-            'user': user
+            'author_pk': label[0],  # Retornado pelo get(classe Atual) no kwargs(pegado na classe pai - ListView)
+            'author_name': label[1],
         })
-        # print(self._temp_context)
-        # retorno de self._temp_context ----> {'author_pk': 1, 'user': <User: rafael>}
-        # User: É o modelo de usuário no Django, que geralmente representa um usuário no sistema. 
-        # Cada instância desse modelo representa um usuário específico no banco de dados.
-        # rafael: É o valor associado ao campo username desse objeto User. No contexto de um modelo de usuário, 
-        # 'rafael' é o nome de usuário (ou login) desse usuário específico.
-        
+
         return super().get(request, *args, **kwargs)
 
-class CategoryListView(PostListView):
+# Base das listagens por categoria e por tag: o nome (título) e o total de posts
+# vêm do cache (blog.taxonomy), e a listagem filtra direto pelo pk, sem JOIN no slug.
+class TaxonomyListView(PostListView):
     # Permitir vazio? Não(False).
     # Esse atributo gera automaticamente o erro 404 not found
     # Quando allow_empty é configurado como False, 
     # isso significa que a visualização não mostrará uma página se o conjunto de consultas (QuerySet) resultar em uma lista vazia.
     allow_empty = False
+    taxonomy = ''  # 'category' ou 'tag'
+    taxonomy_lookup = ''  # Filtro do Post pelo pk da categoria/tag
+    taxonomy_title = ''
+
+    def get(self, request, *args, **kwargs):
+        label = get_label(self.taxonomy, self.kwargs.get('slug'))  # kwargs --> da classe pai, que traz sempre os parametros de URL após a requisição.
+        if label is None:
+            raise Http404()
+        self.taxonomy_pk, self.taxonomy_name = label
+        return super().get(request, *args, **kwargs)
+
+    # Total de posts do contador da taxonomia: usado no 404 (allow_empty),
+    # no ETag e no paginator, sem o COUNT da listagem
+    def get_known_count(self):
+        return self.taxonomy_count(self.taxonomy, self.taxonomy_pk)
 
     def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().filter(category__slug=self.kwargs.get('slug'))  # kwargs --> da classe pai, que traz sempre os parametros de URL após a requisição.
+        return super().get_queryset().filter(**{self.taxonomy_lookup: self.taxonomy_pk})
 
-    # Manipulando o contexto dessa classe -> (CategoryListView)
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        page_title = f'{self.object_list[0].category.name} - Categoria - '  # type: ignore
         ctx.update({
-            'page_title': page_title
+            'page_title': f'{self.taxonomy_name} - {self.taxonomy_title} - '
         })
         return ctx
 
-class PageDetailView(DetailView):
+class CategoryListView(TaxonomyListView):
+    taxonomy = 'category'
+    taxonomy_lookup = 'category_id'
+    taxonomy_title = 'Categoria'
+
+class PageDetailView(DetailConditionalGetMixin, CachedPageMixin, DetailView):
     template_name = 'blog/pages/page.html'  # Template para onde tudo aqui nessa classe será redirecionado
     model = Page
     slug_field = 'slug'
@@ -124,7 +196,7 @@ class PageDetailView(DetailView):
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         ctx = super().get_context_data(**kwargs)
-        page = self.get_object()
+        page = self.object  # Objeto já buscado pelo DetailView.get, não precisamos buscar de novo
         page_title = f'{page.title} - Página -' # type: ignore
 
         ctx.update({
@@ -132,8 +204,16 @@ class PageDetailView(DetailView):
         })
         return ctx
     
+    # O template usa só o HTML renderizado no save (content_html), não o original
     def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().filter(is_published=True)
+        return (
+            super().get_queryset()
+            .filter(is_published=True)
+            .defer(*self.model.rendered_fields)
+        )
+
+    def get_cache_namespaces(self):
+        return ['site', f'page:{self.kwargs.get("slug")}']
     
 class PostDetailView(PageDetailView):
     template_name = 'blog/pages/post.html'  # Template para onde tudo aqui nessa classe será redirecionado
@@ -143,7 +223,7 @@ class PostDetailView(PageDetailView):
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         ctx = super().get_context_data(**kwargs)
-        post = self.get_object()
+        post = self.object
         post_title = f'{post.title} - Post -' # type: ignore
 
         ctx.update({
@@ -151,27 +231,30 @@ class PostDetailView(PageDetailView):
         })
         return ctx
     
+    # O template usa o autor, a categoria e as tags do post.
+    # Trazemos autor e categoria no mesmo SELECT (JOIN) e as tags em uma única query extra.
     def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().filter(is_published=True)
+        return (
+            super().get_queryset()  # is_published=True já vem do PageDetailView
+            .select_related('created_by', 'category')
+            .prefetch_related('tags')
+        )
 
-class TagListView(PostListView):
-    allow_empty = False
+    def get_cache_namespaces(self):
+        return ['site', f'post:{self.kwargs.get("slug")}']
 
-    # Sua principal responsabilidade é retornar um conjunto de consultas (QuerySet) que representa os objetos a serem exibidos na página.
-    def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().filter(tags__slug=self.kwargs.get("slug"))
+class TagListView(TaxonomyListView):
+    taxonomy = 'tag'
+    taxonomy_lookup = 'tags__id'
+    taxonomy_title = 'Tag'
 
-    def get_context_data(self, **kwargs):
-        ctx = super().get_context_data(**kwargs)
-        page_title = f'{self.object_list[0].tags.first().name} - Tag - '  # type: ignore
-
-        ctx.update({
-            'page_title': page_title
-        })
+class SearchListView(PostListView):
+    keyset_pagination = False  # Resultados vêm ordenados por relevância, não por pk
 
-        return ctx
+    # A busca não tem um updated_at barato de calcular: sem ETag/Last-Modified
+    def get_validators(self):
+        return None, None
 
-class SearchListView(PostListView):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)  # Sempre quando estou herdando de uma classe, tenho que chamar o INIT da classe herdada também
         self._search_value = ''
@@ -183,18 +266,20 @@ class SearchListView(PostListView):
         self._search_value = request.GET.get("search", '').strip()
         return super().setup(request, *args, **kwargs)
     
+    # O backend de busca (FTS5 no SQLite, tsvector no PostgreSQL) devolve os posts
+    # ordenados por relevância, e o Paginator busca só a fatia da página atual.
     def get_queryset(self, *args, **kwargs):
-        return super().get_queryset().filter(
-            Q(title__icontains=self._search_value),
-            Q(excerpt__icontains=self._search_value),
-            Q(content__icontains=self._search_value),
-        )[:PER_PAGE]
+        using = router.db_for_read(Post)
+        return get_search_backend(using).search(
+            self._search_value, super().get_queryset()
+        )
     
     def get_context_data(self, *args, **kwargs):
         ctx = super().get_context_data()
         ctx.update({
             'page_title': f'{self._search_value[:30]} - Search -',
-            'search_value': self._search_value
+            'search_value': self._search_value,
+            'search_url': '&' + urlencode({'search': self._search_value}),  # Mantém a busca nos links da paginação
         })
         return ctx
     
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from jobs.models import ImageJob
+
+
+# Somente leitura: serve para acompanhar o status da fila
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = 'id', 'path', 'kind', 'width', 'status', 'attempts', 'updated_at',
+    list_display_links = 'id', 'path',
+    list_filter = 'kind', 'status',
+    search_fields = 'path',
+    list_per_page = 50
+    ordering = '-id',
+    readonly_fields = (
+        'path', 'kind', 'width', 'optimize', 'quality', 'status', 'attempts',
+        'error', 'created_at', 'updated_at', 'finished_at',
+    )
+
+    def has_add_permission(self, request):
+        return False
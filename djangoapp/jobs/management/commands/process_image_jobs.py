@@ -0,0 +1,82 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from jobs.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = 'Processa a fila de imagens (jobs.ImageJob) fora das requisições'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Processa o que estiver pendente e encerra',
+        )
+        parser.add_argument(
+            '--status', action='store_true',
+            help='Mostra quantos jobs existem em cada status e encerra',
+        )
+        parser.add_argument('--batch', type=int, default=20)
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help='Segundos de espera quando a fila está vazia',
+        )
+        parser.add_argument(
+            '--stale-after', type=int, default=600,
+            help='Segundos para um job RUNNING voltar à fila (worker que morreu)',
+        )
+        parser.add_argument('--max-attempts', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if options['status']:
+            return self.print_status()
+
+        while True:
+            self.requeue_stale(options['stale_after'], options['max_attempts'])
+            processed = self.process_batch(options['batch'])
+
+            if options['once'] and not processed:
+                break
+            if not processed:
+                time.sleep(options['sleep'])
+
+    def process_batch(self, batch):
+        jobs = list(
+            ImageJob.objects
+            .filter(status=ImageJob.Status.PENDING)
+            .order_by('pk')[:batch]
+        )
+        processed = 0
+        for job in jobs:
+            if not job.claim():  # Outro worker pegou este job
+                continue
+            ok = job.run()
+            processed += 1
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(style(str(job)))
+        return processed
+
+    def requeue_stale(self, stale_after, max_attempts):
+        limit = timezone.now() - timedelta(seconds=stale_after)
+        stale = ImageJob.objects.filter(
+            status=ImageJob.Status.RUNNING, updated_at__lt=limit,
+        )
+        stale.filter(attempts__lt=max_attempts).update(
+            status=ImageJob.Status.PENDING, updated_at=timezone.now(),
+        )
+        stale.update(
+            status=ImageJob.Status.FAILED, error='Tentativas esgotadas',
+            updated_at=timezone.now(),
+        )
+
+    def print_status(self):
+        counts = dict(
+            ImageJob.objects.values_list('status')
+            .annotate(total=Count('pk')).values_list('status', 'total')
+        )
+        for status, label in ImageJob.Status.choices:
+            self.stdout.write(f'{label}: {counts.get(status, 0)}')
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='imagejob',
+            name='jobs_imagejob_unique_path_width',
+        ),
+        migrations.AddField(
+            model_name='imagejob',
+            name='kind',
+            field=models.CharField(choices=[('resize', 'Redimensionar'), ('derivatives', 'Gerar versões responsivas')], default='resize', max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='imagejob',
+            constraint=models.UniqueConstraint(fields=('path', 'kind', 'width'), name='jobs_imagejob_unique_path_kind_width'),
+        ),
+    ]
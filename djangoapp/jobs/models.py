@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from jobs.signals import image_processed
+from utils.images import make_derivatives, resize_image_file
+
+
+# Fila de processamento de imagens em uma tabela do banco.
+# O save dos models só enfileira, e o comando process_image_jobs faz o trabalho.
+class ImageJob(models.Model):
+    class Meta:
+        verbose_name = 'Image Job'
+        verbose_name_plural = 'Image Jobs'
+        constraints = [
+            # Um mesmo arquivo nunca é processado duas vezes para a mesma tarefa
+            models.UniqueConstraint(
+                fields=['path', 'kind', 'width'],
+                name='jobs_imagejob_unique_path_kind_width',
+            ),
+        ]
+
+    class Kind(models.TextChoices):
+        RESIZE = 'resize', 'Redimensionar'
+        DERIVATIVES = 'derivatives', 'Gerar versões responsivas'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pendente'
+        RUNNING = 'running', 'Executando'
+        DONE = 'done', 'Concluído'
+        FAILED = 'failed', 'Falhou'
+
+    path = models.CharField(max_length=255)  # Nome do arquivo dentro do MEDIA_ROOT
+    kind = models.CharField(
+        max_length=20, choices=Kind.choices, default=Kind.RESIZE,
+    )
+    width = models.PositiveIntegerField()  # 0 para DERIVATIVES (usa DERIVATIVE_WIDTHS)
+    optimize = models.BooleanField(default=True)
+    quality = models.PositiveSmallIntegerField(default=60)
+    status = models.CharField(
+        max_length=10, choices=Status.choices,
+        default=Status.PENDING, db_index=True,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f'{self.path} ({self.get_kind_display()}) - {self.get_status_display()}'
+
+    @classmethod
+    def enqueue(cls, image_django, new_width=800, optimize=True, quality=60):
+        if getattr(settings, 'IMAGE_JOBS_SYNC', False):
+            # Modo síncrono (desenvolvimento): processa na própria requisição
+            resize_image_file(image_django.name, new_width, optimize, quality)
+            return None
+        return cls._enqueue(
+            image_django, cls.Kind.RESIZE, new_width,
+            optimize=optimize, quality=quality,
+        )
+
+    # Versões em várias larguras e formatos (WebP/AVIF) usadas no srcset
+    @classmethod
+    def enqueue_derivatives(cls, image_django, quality=60):
+        if getattr(settings, 'IMAGE_JOBS_SYNC', False):
+            make_derivatives(image_django.name, quality=quality)
+            return None
+        return cls._enqueue(image_django, cls.Kind.DERIVATIVES, 0, quality=quality)
+
+    # Importações em massa (blog/transfer.py): um INSERT para todos os arquivos,
+    # sempre pela fila, mesmo com IMAGE_JOBS_SYNC
+    @classmethod
+    def bulk_enqueue(cls, paths, new_width=800, optimize=True, quality=60, derivatives=True):
+        jobs = []
+        for path in paths:
+            jobs.append(cls(
+                path=str(path), kind=cls.Kind.RESIZE, width=new_width,
+                optimize=optimize, quality=quality,
+            ))
+            if derivatives:
+                jobs.append(cls(
+                    path=str(path), kind=cls.Kind.DERIVATIVES, width=0, quality=quality,
+                ))
+        cls.objects.bulk_create(jobs, ignore_conflicts=True)
+        return len(jobs)
+
+    @classmethod
+    def _enqueue(cls, image_django, kind, width, **defaults):
+        path = str(image_django.name)
+        lookup = {'path': path, 'kind': kind, 'width': width}
+        try:
+            with transaction.atomic():
+                job, created = cls.objects.get_or_create(**lookup, defaults=defaults)
+        except IntegrityError:  # Outra requisição criou o mesmo job ao mesmo tempo
+            return cls.objects.get(**lookup)
+
+        if not created and job.status == cls.Status.FAILED:
+            # Reenviar um arquivo que falhou coloca o job na fila de novo
+            cls.objects.filter(pk=job.pk).update(
+                status=cls.Status.PENDING, error='', **defaults,
+            )
+            job.refresh_from_db()
+        return job
+
+    def claim(self):
+        # UPDATE condicional: só um worker consegue passar o job para RUNNING
+        claimed = ImageJob.objects.filter(
+            pk=self.pk, status=self.Status.PENDING,
+        ).update(
+            status=self.Status.RUNNING,
+            attempts=models.F('attempts') + 1,
+            updated_at=timezone.now(),
+        )
+        return claimed == 1
+
+    def run(self):
+        try:
+            if self.kind == self.Kind.DERIVATIVES:
+                make_derivatives(self.path, quality=self.quality)
+            else:
+                resize_image_file(self.path, self.width, self.optimize, self.quality)
+        except Exception as error:
+            self.status = self.Status.FAILED
+            self.error = f'{type(error).__name__}: {error}'
+        else:
+            self.status = self.Status.DONE
+            self.error = ''
+
+        self.finished_at = timezone.now()
+        ImageJob.objects.filter(pk=self.pk).update(
+            status=self.status, error=self.error,
+            finished_at=self.finished_at, updated_at=self.finished_at,
+        )
+
+        if self.status == self.Status.DONE:
+            image_processed.send(
+                sender=ImageJob, job=self, path=self.path, kind=self.kind,
+            )
+        return self.status == self.Status.DONE
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Enviado pelo worker quando um ImageJob termina com sucesso.
+# Argumentos: job (ImageJob), path (nome do arquivo no MEDIA_ROOT) e kind.
+image_processed = Signal()
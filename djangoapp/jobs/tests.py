@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from jobs.models import ImageJob
+from utils.images import derivative_formats
+
+
+class FakeImageField:
+    def __init__(self, name):
+        self.name = name
+
+
+class ImageJobTests(TestCase):
+    def setUp(self):
+        self.media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def make_image(self, name, size=(1200, 600)):
+        Image.new('RGB', size, 'red').save(self.media_root / name)
+        return FakeImageField(name)
+
+    def test_enqueue_deduplicates_jobs(self):
+        image = self.make_image('capa.jpg')
+        first = ImageJob.enqueue(image, 900)
+        second = ImageJob.enqueue(image, 900)
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(ImageJob.objects.count(), 1)
+
+    def test_worker_resizes_pending_jobs(self):
+        image = self.make_image('capa.jpg')
+        job = ImageJob.enqueue(image, 900)
+
+        call_command('process_image_jobs', '--once', stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.Status.DONE)
+        self.assertEqual(job.attempts, 1)
+        with Image.open(self.media_root / 'capa.jpg') as resized:
+            self.assertEqual(resized.size, (900, 450))
+
+    def test_missing_file_marks_job_as_failed_and_requeues_on_enqueue(self):
+        job = ImageJob.enqueue(FakeImageField('nao-existe.jpg'), 900)
+
+        call_command('process_image_jobs', '--once', stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.Status.FAILED)
+        self.assertIn('nao-existe.jpg', job.error)
+
+        ImageJob.enqueue(FakeImageField('nao-existe.jpg'), 900)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.Status.PENDING)
+
+    def test_claimed_job_is_not_claimed_again(self):
+        job = ImageJob.enqueue(self.make_image('capa.jpg'), 900)
+        self.assertTrue(job.claim())
+        self.assertFalse(job.claim())
+
+    @override_settings(IMAGE_JOBS_SYNC=True)
+    def test_sync_mode_resizes_immediately(self):
+        self.assertIsNone(ImageJob.enqueue(self.make_image('capa.jpg'), 900))
+        self.assertFalse(ImageJob.objects.exists())
+        with Image.open(self.media_root / 'capa.jpg') as resized:
+            self.assertEqual(resized.width, 900)
+
+    def test_status_report(self):
+        ImageJob.enqueue(self.make_image('capa.jpg'), 900)
+        out = StringIO()
+        call_command('process_image_jobs', '--status', stdout=out)
+        self.assertIn('Pendente: 1', out.getvalue())
+
+    def test_derivatives_job_writes_each_width_and_format(self):
+        image = self.make_image('capa.jpg', size=(800, 400))
+        ImageJob.enqueue_derivatives(image)
+
+        call_command('process_image_jobs', '--once', stdout=StringIO())
+
+        for image_format in derivative_formats() + ['jpg']:
+            with Image.open(self.media_root / f'capa-320w.{image_format}') as small:
+                self.assertEqual(small.size, (320, 160))
+            # Sem aumentar: 900w fica com a largura original
+            with Image.open(self.media_root / f'capa-900w.{image_format}') as large:
+                self.assertEqual(large.size, (800, 400))
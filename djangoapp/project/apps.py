@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ProjectConfig(AppConfig):
+    name = 'project'
+
+    def ready(self):
+        import project.db  # noqa: F401 (registra os receivers)
+        import project.metrics  # noqa: F401
@@ -8,9 +8,16 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
 
 import os
+from pathlib import Path
+from dotenv import load_dotenv
 
 from django.core.asgi import get_asgi_application
 
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# DOTENV
+load_dotenv(BASE_DIR.parent / 'dotenv-files' / '.env', override=True)
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 
 application = get_asgi_application()
@@ -0,0 +1,229 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Época compartilhada: qualquer escrita em uma chave do L1 incrementa este
+# valor no cache compartilhado, e os outros processos/servidores descartam o
+# seu L1 quando percebem a mudança (no máximo EPOCH_INTERVAL segundos depois).
+EPOCH_KEY = 'tiered:epoch'
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """
+    Cache em dois níveis: um LRU limitado na memória do processo (L1) na
+    frente de um cache compartilhado entre os workers e servidores (Redis em
+    produção, ver CACHES no settings).
+
+    Só as chaves com os prefixos de L1_KEY_PREFIXES (pequenas e muito lidas:
+    gerações das páginas, contadores, cards) passam pelo L1; o resto vai
+    direto para o compartilhado. Cada entrada do L1 guarda a época em que foi
+    lida e deixa de valer quando a época compartilhada muda.
+
+    A época só muda quando um valor que outro L1 pode ter lido deixa de
+    valer (sobrescrita, delete, incr). Preencher uma chave que não existia
+    (uma falta de cache numa requisição GET) não apaga o L1 de ninguém.
+
+    OPTIONS:
+      SHARED_ALIAS      alias do cache compartilhado em CACHES
+      L1_MAX_ENTRIES    tamanho do LRU (padrão 1000)
+      L1_TIMEOUT        tempo máximo de uma entrada no L1 (padrão 60s)
+      L1_KEY_PREFIXES   prefixos das chaves do L1 (vazio = todas)
+      EPOCH_INTERVAL    de quanto em quanto tempo conferir a época (padrão 1s)
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED_ALIAS', 'shared')
+        self.max_entries = options.get('L1_MAX_ENTRIES', 1000)
+        self.l1_timeout = options.get('L1_TIMEOUT', 60)
+        self.prefixes = tuple(options.get('L1_KEY_PREFIXES', ()))
+        self.epoch_interval = options.get('EPOCH_INTERVAL', 1)
+
+        self._lock = threading.Lock()
+        self._l1 = OrderedDict()  # (chave, versão) -> (pickle, expira_em, época)
+        self._epoch = None
+        self._epoch_checked = 0.0
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def in_l1(self, key):
+        return not self.prefixes or key.startswith(self.prefixes)
+
+    # Época
+    def current_epoch(self):
+        now = time.monotonic()
+        if now - self._epoch_checked >= self.epoch_interval:
+            epoch = self.shared.get(EPOCH_KEY)
+            with self._lock:
+                if epoch != self._epoch:
+                    self._l1.clear()
+                    self._epoch = epoch
+                self._epoch_checked = now
+        return self._epoch
+
+    def bump_epoch(self):
+        # Chamado depois da escrita no compartilhado: quem ler a nova época já lê o valor novo
+        try:
+            epoch = self.shared.incr(EPOCH_KEY)
+        except ValueError:  # Cache compartilhado reiniciado: começa de um valor que não se repete
+            self.shared.add(EPOCH_KEY, time.time_ns(), None)
+            epoch = self.shared.incr(EPOCH_KEY)
+        with self._lock:
+            self._l1.clear()
+            self._epoch = epoch
+            self._epoch_checked = time.monotonic()
+
+    # L1
+    def _l1_timeout(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return self.l1_timeout
+        return min(timeout - time.time(), self.l1_timeout)
+
+    def _l1_get(self, key, version, epoch):
+        with self._lock:
+            entry = self._l1.get((key, version))
+            if entry is None:
+                return None
+            pickled, expires_at, entry_epoch = entry
+            if entry_epoch != epoch or expires_at <= time.monotonic():
+                del self._l1[(key, version)]
+                return None
+            self._l1.move_to_end((key, version))
+        return pickle.loads(pickled)
+
+    def _l1_set(self, key, version, value, epoch, timeout=DEFAULT_TIMEOUT):
+        ttl = self._l1_timeout(timeout)
+        if ttl <= 0:
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._l1[(key, version)] = (pickled, time.monotonic() + ttl, epoch)
+            self._l1.move_to_end((key, version))
+            while len(self._l1) > self.max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, keys, version):
+        with self._lock:
+            for key in keys:
+                self._l1.pop((key, version), None)
+
+    # API do cache do Django
+    def get(self, key, default=None, version=None):
+        if not self.in_l1(key):
+            return self.shared.get(key, default, version)
+
+        epoch = self.current_epoch()
+        value = self._l1_get(key, version, epoch)
+        if value is not None:
+            return value
+        value = self.shared.get(key, _MISSING, version)
+        if value is _MISSING:
+            return default
+        self._l1_set(key, version, value, epoch)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = {}
+        epoch = self.current_epoch() if any(map(self.in_l1, keys)) else None
+        for key in keys:
+            if self.in_l1(key):
+                value = self._l1_get(key, version, epoch)
+                if value is not None:
+                    found[key] = value
+
+        missing = [key for key in keys if key not in found]
+        if missing:
+            shared = self.shared.get_many(missing, version)
+            for key, value in shared.items():
+                if self.in_l1(key):
+                    self._l1_set(key, version, value, epoch)
+            found.update(shared)
+        return found
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version) is not _MISSING
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if not self.in_l1(key):
+            self.shared.set(key, value, timeout, version)
+        elif not self.add(key, value, timeout, version):  # Só sobrescrever troca a época
+            self.shared.set(key, value, timeout, version)
+            self.bump_epoch()
+            self._l1_set(key, version, value, self._epoch, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version)
+        if added and self.in_l1(key):
+            # Chave que não existia: não há valor antigo nos L1 (além do L1_TIMEOUT), sem época nova
+            self._l1_set(key, version, value, self.current_epoch(), timeout)
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        # Chaves do L1 que não existiam entram com add (sem época nova), como no set
+        existing = {
+            key: value for key, value in data.items()
+            if not self.in_l1(key) or not self.add(key, value, timeout, version)
+        }
+        if not existing:
+            return []
+        failed = self.shared.set_many(existing, timeout, version)
+        l1_keys = [key for key in existing if self.in_l1(key) and key not in failed]
+        if l1_keys:
+            self.bump_epoch()
+            for key in l1_keys:
+                self._l1_set(key, version, existing[key], self._epoch, timeout)
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        deleted = self.shared.delete(key, version)
+        if self.in_l1(key):
+            self._l1_delete([key], version)
+            self.bump_epoch()
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.shared.delete_many(keys, version)
+        l1_keys = [key for key in keys if self.in_l1(key)]
+        if l1_keys:
+            self._l1_delete(l1_keys, version)
+            self.bump_epoch()
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version)
+        if self.in_l1(key):
+            self._l1_delete([key], version)
+            self.bump_epoch()
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version)
+
+    def clear(self):
+        self.shared.clear()
+        with self._lock:
+            self._l1.clear()
+            self._epoch = None
+            self._epoch_checked = 0.0
+
+    def clear_l1(self):
+        # Só a memória deste processo (usado nos testes para simular outro servidor)
+        with self._lock:
+            self._l1.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
@@ -0,0 +1,108 @@
+import gzip
+import re
+
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli  # Opcional: sem ele só gzip
+except ImportError:
+    brotli = None
+
+# Abaixo disso os headers extras custam mais que a economia
+MIN_SIZE = 200
+
+# Imagens, vídeos, zip etc. já vêm comprimidos
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml|xhtml\+xml|rss\+xml|atom\+xml)|image/svg\+xml)'
+)
+
+
+def available_encodings():
+    # Em ordem de preferência
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)  # 11 é lento demais por requisição
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def encode_variants(data):
+    # Versões comprimidas guardadas junto com a página no cache (blog.cache)
+    variants = {}
+    for encoding in available_encodings():
+        compressed = compress(data, encoding)
+        if len(compressed) < len(data):
+            variants[encoding] = compressed
+    return variants
+
+
+def accepted_encoding(request, encodings):
+    # Primeira codificação da lista (ordem do servidor) aceita com q > 0
+    accepted = {}
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def should_compress(request, response):
+    return (
+        not response.streaming  # FileResponse de /static/ usa os .br/.gz do collectstatic
+        and response.status_code == 200
+        and not response.has_header('Content-Encoding')
+        and COMPRESSIBLE_TYPES.match(response.get('Content-Type', ''))
+        and 'no-transform' not in response.get('Cache-Control', '')
+        and len(response.content) >= MIN_SIZE
+        # Páginas com token CSRF (admin, login) ficam sem compressão por causa do BREACH
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+class CompressionMiddleware:
+    """
+    Comprime as respostas com brotli ou gzip, conforme o Accept-Encoding.
+
+    Páginas vindas do cache do blog trazem as versões já comprimidas em
+    response.encoded_variants, então a compressão acontece só uma vez.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not should_compress(request, response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        variants = getattr(response, 'encoded_variants', None) or {}
+        encoding = accepted_encoding(request, tuple(variants) or available_encodings())
+        if encoding is None:
+            return response
+
+        compressed = variants.get(encoding) or compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # O corpo mudou: ETag forte vira fraco (mesmo critério do GZipMiddleware)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,57 @@
+import os
+import threading
+from collections import defaultdict
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import JsonResponse
+
+# Métricas das conexões com o banco, por processo (cada worker do gunicorn tem
+# as suas). Com CONN_MAX_AGE as conexões são reaproveitadas entre requisições,
+# então "opened" deve crescer bem menos que "requests".
+_lock = threading.Lock()
+_stats = defaultdict(lambda: {'opened': 0, 'requests': 0, 'reused': 0})
+
+
+@receiver(connection_created, dispatch_uid='project_db_connection_created')
+def count_connection(sender, connection, **kwargs):
+    with _lock:
+        _stats[connection.alias]['opened'] += 1
+
+
+# Roda depois do close_old_connections do Django (registrado antes), então
+# uma conexão ainda aberta aqui vai ser reaproveitada nesta requisição.
+@receiver(request_started, dispatch_uid='project_db_request_started')
+def count_request(sender, **kwargs):
+    with _lock:
+        for connection in connections.all():
+            stats = _stats[connection.alias]
+            stats['requests'] += 1
+            if connection.connection is not None:
+                stats['reused'] += 1
+
+
+def get_connection_stats():
+    with _lock:
+        result = {}
+        for alias, stats in _stats.items():
+            requests = stats['requests']
+            result[alias] = {
+                **stats,
+                'reuse_ratio': round(stats['reused'] / requests, 3) if requests else None,
+                'conn_max_age': connections[alias].settings_dict.get('CONN_MAX_AGE'),
+            }
+        return result
+
+
+def reset_connection_stats():
+    with _lock:
+        _stats.clear()
+
+
+@staff_member_required
+def connection_stats_view(request):
+    return JsonResponse({'pid': os.getpid(), 'databases': get_connection_stats()})
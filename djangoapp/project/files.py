@@ -0,0 +1,211 @@
+import mimetypes
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+# Nomes com hash do ManifestStaticFilesStorage (ex.: style.4f1c2a9b3d7e.css)
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Versões comprimidas geradas no collectstatic (project/storage.py), por preferência
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """
+    Arquivo limitado a um trecho (Range). Expõe fileno() para o gunicorn usar
+    sendfile a partir da posição atual, com o tamanho do Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    # Só um intervalo por requisição (o suficiente para vídeo/download retomado).
+    # Retorna (início, tamanho), None para ignorar o header ou False se inválido.
+    match = _RANGE.match(header.strip())
+    if not match or not size:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # bytes=-500: os últimos 500 bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end - start + 1
+
+
+class FileServingMiddleware:
+    """
+    Serve /static/ (STATIC_ROOT) e /media/ (MEDIA_ROOT) em produção.
+
+    FILE_SERVING define quem envia o arquivo:
+      django     = FileResponse (sendfile no gunicorn), com Range, ETag e
+                   Last-Modified, e .br/.gz pré-comprimidos dos estáticos
+      x-accel    = header X-Accel-Redirect para o nginx (location internal em
+                   FILE_SERVING_INTERNAL_PREFIX + static/ ou media/)
+      x-sendfile = header X-Sendfile com o caminho absoluto (Apache/lighttpd)
+      off        = não intercepta nada (o proxy serve os arquivos direto)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.mode = getattr(settings, 'FILE_SERVING', 'django')
+        self.roots = [
+            (url, root, kind)
+            for url, root, kind in (
+                (settings.STATIC_URL, settings.STATIC_ROOT, 'static'),
+                (settings.MEDIA_URL, settings.MEDIA_ROOT, 'media'),
+            )
+            if url and root and url.startswith('/')
+        ]
+
+    def __call__(self, request):
+        if self.mode == 'off' or request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+
+        for url, root, kind in self.roots:
+            if request.path.startswith(url):
+                return self.serve(request, request.path[len(url):], root, kind)
+        return self.get_response(request)
+
+    def serve(self, request, name, root, kind):
+        try:
+            path = Path(safe_join(root, name))
+        except SuspiciousFileOperation:  # ../ fora da pasta
+            raise Http404()
+        if not name or not path.is_file():
+            raise Http404()
+
+        if self.mode == 'x-accel':
+            prefix = getattr(settings, 'FILE_SERVING_INTERNAL_PREFIX', '/internal/')
+            return self.proxy_response(
+                path, 'X-Accel-Redirect', quote(f'{prefix}{kind}/{name}'),
+            )
+        if self.mode == 'x-sendfile':
+            return self.proxy_response(path, 'X-Sendfile', str(path))
+
+        filename = path.name
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        stat = path.stat()
+
+        # .br/.gz só para a resposta inteira (Range é sempre sobre o original)
+        encoding = None
+        if kind == 'static' and 'HTTP_RANGE' not in request.META:
+            encoding, path = self.precompressed(request, path)
+
+        etag = quote_etag(
+            f'{stat.st_mtime_ns:x}-{stat.st_size:x}' + (f'-{encoding}' if encoding else '')
+        )
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(stat.st_mtime),
+            'Cache-Control': self.cache_control(name, kind),
+            'Accept-Ranges': 'bytes',
+        }
+        if kind == 'static':
+            headers['Vary'] = 'Accept-Encoding'
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=int(stat.st_mtime),
+        )
+        if not_modified is not None:
+            for header, value in headers.items():
+                not_modified[header] = value
+            return not_modified
+
+        size = path.stat().st_size if encoding else stat.st_size
+        byte_range = None
+        if 'HTTP_RANGE' in request.META and self.if_range_matches(request, etag, stat):
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+            if byte_range is False:
+                response = HttpResponse(status=416, headers=headers)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type, headers=headers)
+        elif byte_range:
+            start, length = byte_range
+            response = FileResponse(
+                RangeFile(open(path, 'rb'), start, length), filename=filename,
+                content_type=content_type, status=206, headers=headers,
+            )
+        else:
+            response = FileResponse(
+                open(path, 'rb'), filename=filename,
+                content_type=content_type, headers=headers,
+            )
+
+        if byte_range:
+            start, length = byte_range
+            response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+            size = length
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Content-Length'] = size
+        return response
+
+    def precompressed(self, request, path):
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding in accepted:
+                compressed = path.with_name(path.name + suffix)
+                if compressed.is_file():
+                    return encoding, compressed
+        return None, path
+
+    def if_range_matches(self, request, etag, stat):
+        # If-Range: só vale o Range se o arquivo não mudou desde a primeira parte
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range:
+            return True
+        if if_range.startswith(('"', 'W/')):
+            return if_range == etag
+        return parse_http_date_safe(if_range) == int(stat.st_mtime)
+
+    def cache_control(self, name, kind):
+        if kind == 'static' and HASHED_NAME.search(name):
+            return IMMUTABLE
+        max_age = getattr(settings, f'{kind.upper()}_MAX_AGE', 3600)
+        return f'public, max-age={max_age}'
+
+    def proxy_response(self, path, header, value):
+        # O proxy envia o arquivo (com Range e sendfile); aqui só os headers
+        response = HttpResponse(
+            content_type=mimetypes.guess_type(path.name)[0] or 'application/octet-stream',
+        )
+        response[header] = value
+        return response
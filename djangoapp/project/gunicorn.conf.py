@@ -0,0 +1,57 @@
+"""
+Configuração do gunicorn para produção (usada por scripts/runserver.sh).
+
+    gunicorn -c project/gunicorn.conf.py project.wsgi
+
+Com SERVER_INTERFACE=asgi o mesmo arquivo sobe project.asgi com workers do
+uvicorn. Reload sem derrubar conexões: kill -HUP <pid do master>.
+"""
+
+import multiprocessing
+import os
+
+# Rede
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+backlog = int(os.getenv('GUNICORN_BACKLOG', 2048))
+
+# Workers (pré-fork): por padrão 2 x núcleos + 1, o recomendado para workers
+# síncronos que passam parte do tempo esperando o banco.
+workers = int(
+    os.getenv('GUNICORN_WORKERS') or multiprocessing.cpu_count() * 2 + 1
+)
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+
+if os.getenv('SERVER_INTERFACE', 'wsgi') == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    worker_class = os.getenv(
+        'GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync',
+    )
+
+# Recicla cada worker depois de N requisições (com jitter para não reiniciar
+# todos juntos), limitando vazamentos de memória em processos longos.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Carrega o Django uma vez no master e compartilha a memória com os workers
+# (copy-on-write). Atenção: com preload o HUP não recarrega o código novo,
+# nesse caso use GUNICORN_PRELOAD=0 ou reinicie o master.
+preload_app = bool(int(os.getenv('GUNICORN_PRELOAD', 0)))
+
+# /dev/shm evita travamentos do heartbeat em containers com disco lento
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm')
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Conexões abertas no master (preload_app) não podem ser compartilhadas
+    # entre processos: cada worker abre as suas.
+    from django.db import connections
+    connections.close_all()
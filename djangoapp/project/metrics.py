@@ -0,0 +1,313 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.dispatch import Signal, receiver
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from project.db import get_connection_stats
+
+# Enviado pelos caches da aplicação (página do blog, site_setup, taxonomia):
+# cache_accessed.send(sender=..., name='page', hit=True). Sem requisição
+# amostrada em andamento o receiver não faz nada.
+cache_accessed = Signal()
+
+# Perfil da requisição atual (só nas requisições amostradas)
+_current = ContextVar('metrics_profile', default=None)
+
+# Os totais ficam no cache compartilhado (Redis), somados de todos os workers e
+# servidores: cada processo acumula os incrementos na memória e os envia com
+# incr no máximo a cada METRICS_FLUSH_INTERVAL segundos. Assim qualquer worker
+# que responda o /metrics devolve os mesmos contadores, sempre crescentes.
+VIEWS_KEY = 'metrics:views'
+# Tempos vão em microssegundos: o incr do Redis só aceita inteiros
+MICROSECONDS = 1_000_000
+# Contadores de project.db enviados ao cache
+DB_METRICS = ('opened', 'requests', 'reused')
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_pending = defaultdict(lambda: defaultdict(float))  # Ainda não enviados, por view
+_db_sent = defaultdict(dict)  # Último valor de project.db já enviado, por alias
+_flushed_at = 0.0
+
+# Nome -> (tipo, descrição) das métricas do /metrics
+METRICS = {
+    'requests_total': ('counter', 'Requisições atendidas'),
+    'request_seconds_total': ('counter', 'Tempo total das requisições'),
+    'sampled_requests_total': ('counter', 'Requisições amostradas (com as métricas abaixo)'),
+    'db_queries_total': ('counter', 'Queries SQL nas requisições amostradas'),
+    'db_seconds_total': ('counter', 'Tempo no banco nas requisições amostradas'),
+    'template_seconds_total': ('counter', 'Tempo de renderização dos templates'),
+    'cache_hits_total': ('counter', 'Acertos de cache nas requisições amostradas'),
+    'cache_misses_total': ('counter', 'Faltas de cache nas requisições amostradas'),
+}
+
+
+class RequestProfile:
+    __slots__ = ('queries', 'db_time', 'template_time', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = self.template_time = 0.0
+        self.cache_hits = defaultdict(int)
+        self.cache_misses = defaultdict(int)
+
+    # connection.execute_wrapper: conta cada query e o tempo no banco
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+@receiver(cache_accessed, dispatch_uid='project_metrics_cache_accessed')
+def record_cache_access(sender, name, hit, **kwargs):
+    profile = _current.get()
+    if profile is not None:
+        (profile.cache_hits if hit else profile.cache_misses)[name] += 1
+
+
+def _key(*parts):
+    return 'metrics:' + ':'.join(parts)
+
+
+def _to_cache(name, value):
+    return round(value * MICROSECONDS) if name.endswith('_seconds_total') else round(value)
+
+
+def _from_cache(name, value):
+    return value / MICROSECONDS if name.endswith('_seconds_total') else value
+
+
+def _incr(key, delta):
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:  # Primeiro envio (ou cache reiniciado)
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def _register_views(views):
+    # Relido a cada envio: um registro perdido numa corrida (ou num cache
+    # reiniciado) é refeito no próximo envio da view
+    if not views:
+        return
+    registered = cache.get(VIEWS_KEY, [])
+    if not set(views) <= set(registered):
+        cache.set(VIEWS_KEY, sorted({*registered, *views}), None)
+
+
+def flush_stats(force=False):
+    """Soma no cache compartilhado o que este processo contou desde o último envio."""
+    global _flushed_at
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 10)
+    if not force and time.monotonic() - _flushed_at < interval:
+        return
+    if not _flush_lock.acquire(blocking=force):
+        return  # Outra thread já está enviando
+    try:
+        _flushed_at = time.monotonic()
+        with _lock:
+            pending = {view: dict(stats) for view, stats in _pending.items()}
+            _pending.clear()
+
+        _register_views(pending)
+        for view, stats in pending.items():
+            for name, value in stats.items():
+                _incr(_key('view', view, name), _to_cache(name, value))
+
+        for alias, stats in get_connection_stats().items():
+            sent = _db_sent[alias]
+            for name in DB_METRICS:
+                delta = stats[name] - sent.get(name, 0)
+                _incr(_key('db', alias, name), delta if delta >= 0 else stats[name])
+                sent[name] = stats[name]
+    finally:
+        _flush_lock.release()
+
+
+def get_view_stats():
+    """Totais por view, de todos os processos."""
+    flush_stats(force=True)
+    keys = {
+        _key('view', view, name): (view, name)
+        for view in cache.get(VIEWS_KEY, []) for name in METRICS
+    }
+    stats = defaultdict(dict)
+    for key, value in cache.get_many(keys).items():
+        view, name = keys[key]
+        stats[view][name] = _from_cache(name, value)
+    return dict(stats)
+
+
+def get_db_stats():
+    """Contadores das conexões (project.db) por alias, de todos os processos."""
+    flush_stats(force=True)
+    keys = {
+        _key('db', alias, name): (alias, name)
+        for alias in connections for name in DB_METRICS
+    }
+    stats = {alias: dict.fromkeys(DB_METRICS, 0) for alias in connections}
+    for key, value in cache.get_many(keys).items():
+        alias, name = keys[key]
+        stats[alias][name] = value
+    return stats
+
+
+def reset_view_stats():
+    global _flushed_at
+    with _flush_lock, _lock:
+        cache.delete_many([
+            *(_key('view', view, name) for view in cache.get(VIEWS_KEY, []) for name in METRICS),
+            *(_key('db', alias, name) for alias in connections for name in DB_METRICS),
+            VIEWS_KEY,
+        ])
+        _pending.clear()
+        _db_sent.clear()
+        _flushed_at = 0.0
+
+
+def _record(view_name, elapsed, profile):
+    with _lock:
+        stats = _pending[view_name]
+        stats['requests_total'] += 1
+        stats['request_seconds_total'] += elapsed
+        if profile is None:
+            return
+        stats['sampled_requests_total'] += 1
+        stats['db_queries_total'] += profile.queries
+        stats['db_seconds_total'] += profile.db_time
+        stats['template_seconds_total'] += profile.template_time
+        stats['cache_hits_total'] += sum(profile.cache_hits.values())
+        stats['cache_misses_total'] += sum(profile.cache_misses.values())
+
+
+def server_timing(elapsed, profile):
+    # Header Server-Timing (aparece na aba Network/Timing do navegador)
+    parts = [
+        f'db;desc="{profile.queries} queries";dur={profile.db_time * 1000:.1f}',
+        f'tpl;dur={profile.template_time * 1000:.1f}',
+    ]
+    for name in sorted({*profile.cache_hits, *profile.cache_misses}):
+        parts.append(
+            f'cache-{name};desc="{profile.cache_hits[name]} hit, '
+            f'{profile.cache_misses[name]} miss"'
+        )
+    parts.append(f'total;dur={elapsed * 1000:.1f}')
+    return ', '.join(parts)
+
+
+class MetricsMiddleware:
+    """
+    Mede as requisições por view (resolver_match.view_name).
+
+    Toda requisição conta no total e no tempo. Só uma fração delas
+    (METRICS_SAMPLE_RATE) é amostrada: essas têm as queries contadas por
+    execute_wrapper, o tempo de renderização do template e os acertos de
+    cache (sinal cache_accessed), e recebem o header Server-Timing.
+    Fora da amostra o custo é um perf_counter e um lock (mais o envio
+    periódico dos totais para o cache, ver flush_stats).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+        self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        profile = RequestProfile() if random.random() < self.sample_rate else None
+        request._metrics_profile = profile
+        start = time.perf_counter()
+        if profile is None:
+            response = self.get_response(request)
+        else:
+            token = _current.set(profile)
+            try:
+                with ExitStack() as stack:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(profile))
+                    response = self.get_response(request)
+            finally:
+                _current.reset(token)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        _record(match.view_name if match else 'unresolved', elapsed, profile)
+        flush_stats()
+        if profile is not None and self.server_timing:
+            response['Server-Timing'] = server_timing(elapsed, profile)
+        return response
+
+    def process_template_response(self, request, response):
+        # Este é o último process_template_response antes do render()
+        # (a ordem é inversa à do MIDDLEWARE), então o tempo é só do template
+        profile = getattr(request, '_metrics_profile', None)
+        if profile is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                profile.template_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def render_metrics():
+    """Métricas de todos os processos no formato texto do Prometheus."""
+    lines = []
+    views = get_view_stats()
+    for name, (kind, description) in METRICS.items():
+        metric = f'blog_{name}'
+        lines += [f'# HELP {metric} {description}', f'# TYPE {metric} {kind}']
+        for view, stats in sorted(views.items()):
+            lines.append(f'{metric}{{{_labels(view=view)}}} {float(stats.get(name, 0))!r}')
+
+    connection_metrics = (
+        ('opened', 'Conexões abertas com o banco'),
+        ('requests', 'Requisições vistas por conexão'),
+        ('reused', 'Requisições que reaproveitaram a conexão'),
+    )
+    db_stats = get_db_stats()
+    for key, description in connection_metrics:
+        metric = f'db_connections_{key}_total'
+        lines += [f'# HELP {metric} {description}', f'# TYPE {metric} counter']
+        for alias, stats in sorted(db_stats.items()):
+            lines.append(f'{metric}{{{_labels(alias=alias)}}} {stats[key]}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    # Staff logado ou o Prometheus com "Authorization: Bearer <METRICS_TOKEN>"
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorization = request.headers.get('Authorization', '')
+    allowed = request.user.is_staff or (
+        token and constant_time_compare(authorization, f'Bearer {token}')
+    )
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
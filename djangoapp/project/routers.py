@@ -0,0 +1,108 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Apps que sempre leem do primário: login, sessão, bloqueios do axes, admin e
+# a fila de imagens (o worker atualiza o status e relê logo em seguida).
+PRIMARY_APPS = {
+    'admin', 'auth', 'contenttypes', 'sessions', 'axes', 'jobs',
+    'django_summernote',
+}
+
+# Cookie que prende o navegador no primário logo depois de uma escrita
+STICKY_COOKIE = 'db_primary'
+
+_use_replicas = ContextVar('use_replicas', default=False)
+_wrote = ContextVar('wrote', default=False)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def request_routing(read_from_replicas=True):
+    # Escopo de uma requisição: liga (ou não) as réplicas e zera o controle de escrita
+    replicas = _use_replicas.set(read_from_replicas)
+    wrote = _wrote.set(False)
+    try:
+        yield
+    finally:
+        _use_replicas.reset(replicas)
+        _wrote.reset(wrote)
+
+
+def wrote_to_primary():
+    return _wrote.get()
+
+
+class ReplicaRouter:
+    """
+    Leituras das views públicas vão para uma réplica sorteada em
+    DATABASE_REPLICAS; todo o resto (admin, comandos, worker, escritas)
+    fica no primário ('default').
+
+    Só há leitura em réplica dentro de request_routing(), ativado pelo
+    ReplicaMiddleware. Fora dele o comportamento é o mesmo de sem router.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if (
+            not replicas or not _use_replicas.get() or _wrote.get()
+            or model._meta.app_label in PRIMARY_APPS
+        ):
+            return 'default'
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # A partir daqui a requisição lê do primário (vê o que acabou de gravar)
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {'default', *get_replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Réplicas recebem o schema pela replicação do PostgreSQL
+        return db not in get_replicas()
+
+
+class ReplicaMiddleware:
+    """
+    Ativa as réplicas para GET/HEAD fora do /admin/. Depois de uma escrita
+    (POST no admin, upload do summernote...) grava um cookie que mantém o
+    navegador no primário por REPLICA_STICKY_SECONDS, cobrindo o atraso da
+    replicação (read-your-writes).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_replicas():
+            return self.get_response(request)
+
+        with request_routing(self.reads_from_replica(request)):
+            response = self.get_response(request)
+            wrote = wrote_to_primary()
+
+        if wrote or request.method not in ('GET', 'HEAD'):
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 15),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def reads_from_replica(self, request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and not request.path.startswith('/admin/')
+            and STICKY_COOKIE not in request.COOKIES
+        )
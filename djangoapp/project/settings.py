@@ -29,8 +29,8 @@ load_dotenv(BASE_DIR.parent / 'dotenv-files' / '.env', override=True)
 SECRET_KEY = os.getenv('SECRET_KEY', 'change-me')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-#       bool(int(os.getenv('DEBUG', 0)))
-DEBUG = 1
+# 0 = produção (gunicorn, ver scripts/runserver.sh), 1 = runserver de desenvolvimento
+DEBUG = bool(int(os.getenv('DEBUG', 0)))
 
 ALLOWED_HOSTS = [
     h.strip() for h in os.getenv('ALLOWED_HOSTS', '').split(',')
@@ -51,6 +51,8 @@ INSTALLED_APPS = [
     # Meus apps
     'blog',
     'site_setup',
+    'jobs',
+    'project',  # Métricas das conexões com o banco (project/db.py)
 
     # Summernote
     'django_summernote',
@@ -61,6 +63,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'project.compression.CompressionMiddleware',
+    'project.files.FileServingMiddleware',
+    'project.routers.ReplicaMiddleware',
+    'project.metrics.MetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -102,12 +108,57 @@ WSGI_APPLICATION = 'project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
+
+if 'sqlite' in DB_ENGINE:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
     }
-}
+else:
+    # DB_POOL_MODE:
+    #   persistent = cada worker/thread mantém a sua conexão aberta por CONN_MAX_AGE
+    #   pgbouncer  = POSTGRES_HOST aponta para o pgbouncer (pool_mode=transaction);
+    #                cursores no servidor não sobrevivem entre transações
+    DB_POOL_MODE = os.getenv('DB_POOL_MODE', 'persistent')
+
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.getenv('POSTGRES_DB'),
+            'USER': os.getenv('POSTGRES_USER'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
+            'HOST': os.getenv('POSTGRES_HOST'),
+            'PORT': os.getenv('POSTGRES_PORT'),
+            # Segundos que a conexão é reaproveitada entre requisições (0 = fecha sempre)
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            # Testa a conexão reaproveitada antes do primeiro uso na requisição
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': DB_POOL_MODE == 'pgbouncer',
+            'OPTIONS': {
+                'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+                'application_name': os.getenv('DB_APPLICATION_NAME', 'blog'),
+            },
+        }
+    }
+
+    # Réplicas de leitura (hosts separados por vírgula) usadas pelas views
+    # públicas. Nos testes elas espelham o banco default.
+    for index, host in enumerate(filter(None, (
+        h.strip() for h in os.getenv('DB_REPLICA_HOSTS', '').split(',')
+    )), start=1):
+        DATABASES[f'replica{index}'] = {
+            **DATABASES['default'],
+            'HOST': host,
+            'TEST': {'MIRROR': 'default'},
+        }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['project.routers.ReplicaRouter']
+# Segundos que o navegador continua lendo do primário depois de uma escrita
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 15))
 
 
 # Password validation
@@ -149,10 +200,82 @@ STATIC_URL = '/static/'
 # /data/web/static
 STATIC_ROOT = DATA_DIR / 'static'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Nomes com hash do conteúdo + .gz/.br gerados no collectstatic (project/storage.py)
+    'staticfiles': {
+        'BACKEND': 'project.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 MEDIA_URL = '/media/'
 # /data/web/media
 MEDIA_ROOT = DATA_DIR / 'media'
 
+# Quem envia /static/ e /media/ (project/files.py): django, x-accel (nginx),
+# x-sendfile (Apache) ou off (o proxy serve direto das pastas acima)
+FILE_SERVING = os.getenv('FILE_SERVING', 'django')
+# Prefixo das locations "internal" do nginx no modo x-accel
+FILE_SERVING_INTERNAL_PREFIX = os.getenv('FILE_SERVING_INTERNAL_PREFIX', '/internal/')
+# Cache no navegador (segundos) dos arquivos sem hash no nome
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 3600))
+MEDIA_MAX_AGE = int(os.getenv('MEDIA_MAX_AGE', 86400))
+
+# Métricas por view (project/metrics.py): fração das requisições amostradas
+# (queries, tempo no banco/template, cache) e header Server-Timing nelas.
+# /metrics exige usuário staff ou "Authorization: Bearer METRICS_TOKEN".
+# Os totais de todos os workers são somados no cache compartilhado, enviados
+# por cada processo a cada METRICS_FLUSH_INTERVAL segundos.
+METRICS_ENABLED = bool(int(os.getenv('METRICS_ENABLED', 1)))
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', 1 if DEBUG else 0.1))
+METRICS_SERVER_TIMING = bool(int(os.getenv('METRICS_SERVER_TIMING', 1)))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 10))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Cache em dois níveis (project/cache.py): LRU na memória de cada processo (L1)
+# para as chaves pequenas e muito lidas, na frente de um cache compartilhado
+# entre workers e servidores. CACHE_URL (ex.: redis://127.0.0.1:6379/0) usa o
+# Redis; vazio usa um LocMemCache (só para desenvolvimento: um por processo).
+CACHE_URL = os.getenv('CACHE_URL', '')
+# Sessões e tentativas de login (axes) ficam em um cache separado ('auth'), para
+# o tráfego de login não disputar o banco nem o cache das páginas. Pode ser
+# outro Redis, com maxmemory e maxmemory-policy volatile-lru (toda chave expira).
+AUTH_CACHE_URL = os.getenv('AUTH_CACHE_URL', CACHE_URL)
+CACHES = {
+    'default': {
+        'BACKEND': 'project.cache.TieredCache',
+        'OPTIONS': {
+            'SHARED_ALIAS': 'shared',
+            'L1_MAX_ENTRIES': int(os.getenv('CACHE_L1_MAX_ENTRIES', 1000)),
+            'L1_TIMEOUT': int(os.getenv('CACHE_L1_TIMEOUT', 60)),
+            'L1_KEY_PREFIXES': [
+                'blog:gen:', 'blog:count:', 'blog:label:', 'blog:aggregate:',
+                'template.cache.post_card', 'site_setup:',
+            ],
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+        'KEY_PREFIX': 'blog',
+    } if CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {'MAX_ENTRIES': 10_000},
+    },
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': AUTH_CACHE_URL,
+        'KEY_PREFIX': 'auth',
+    } if AUTH_CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth',
+        'OPTIONS': {'MAX_ENTRIES': 5_000},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -196,4 +319,38 @@ SUMMERNOTE_CONFIG = {
 AXES_ENABLED = True
 AXES_FAILURE_LIMIT = 6
 AXES_COOLOFF_TIME = 1  # 1 HORA
-AXES_RESET_ON_SUCCESS = True
\ No newline at end of file
+AXES_RESET_ON_SUCCESS = True
+
+# Com o cache 'auth' compartilhado (Redis), sessões e tentativas de login não
+# gravam no banco. Sem ele (desenvolvimento), a sessão usa cached_db (lê do
+# cache, grava no banco) e o axes o banco: um LocMemCache por processo perderia
+# sessões entre os workers e contaria as tentativas separadas em cada um.
+SESSION_CACHE_ALIAS = 'auth'
+AXES_CACHE = 'auth'
+if AUTH_CACHE_URL:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+    AXES_HANDLER = 'axes.handlers.cache.AxesCacheHandler'
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    AXES_HANDLER = 'axes.handlers.database.AxesDatabaseHandler'
+# Tempo (segundos) que o snapshot do SiteSetup fica em cache em cada processo.
+# Os signals do site_setup limpam o cache local ao salvar pelo admin.
+SITE_SETUP_CACHE_TTL = int(os.getenv('SITE_SETUP_CACHE_TTL', 60))
+
+# Backend de busca dos posts (caminho da classe). Vazio escolhe pelo banco:
+# FTS5 no SQLite, tsvector + GIN no PostgreSQL e icontains nos demais.
+BLOG_SEARCH_BACKEND = os.getenv('BLOG_SEARCH_BACKEND', '')
+# Configuração de idioma do to_tsvector no PostgreSQL
+BLOG_SEARCH_CONFIG = os.getenv('BLOG_SEARCH_CONFIG', 'portuguese')
+
+# Paginação por cursor (keyset) nas listagens de posts: evita COUNT + OFFSET
+# a cada página. O total de páginas usa um COUNT em cache por BLOG_COUNT_CACHE_TIMEOUT.
+BLOG_KEYSET_PAGINATION = bool(int(os.getenv('BLOG_KEYSET_PAGINATION', 0)))
+BLOG_COUNT_CACHE_TIMEOUT = int(os.getenv('BLOG_COUNT_CACHE_TIMEOUT', 60))
+
+# True processa as imagens na própria requisição (sem o worker process_image_jobs)
+IMAGE_JOBS_SYNC = bool(int(os.getenv('IMAGE_JOBS_SYNC', 0)))
+
+# Tempo (segundos) das páginas públicas e dos cards em cache para visitantes anônimos.
+# Os signals do blog invalidam o cache quando algo é salvo no admin.
+BLOG_PAGE_CACHE_TIMEOUT = int(os.getenv('BLOG_PAGE_CACHE_TIMEOUT', 300))
@@ -0,0 +1,69 @@
+import gzip
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli  # Opcional: sem ele só geramos o .gz
+except ImportError:
+    brotli = None
+
+# Só vale a pena comprimir texto, e arquivos muito pequenos não compensam
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.map', '.svg', '.txt', '.json', '.xml', '.html',
+    '.ttf', '.otf', '.eot', '.ico',
+}
+MIN_SIZE = 256
+
+
+def compress_file(path):
+    # Gera os irmãos .gz e .br de um arquivo, se ficarem menores que o original
+    path = Path(path)
+    data = path.read_bytes()
+    if len(data) < MIN_SIZE:
+        return []
+
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+
+    written = []
+    for suffix, compressed in variants:
+        if len(compressed) < len(data):
+            target = path.with_name(path.name + suffix)
+            target.write_bytes(compressed)
+            written.append(target)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage (nomes com hash do conteúdo, ex.: style.4f1c2a.css)
+    que também grava as versões .gz e .br no collectstatic, para o servidor
+    entregar o arquivo já comprimido.
+
+    Sem o manifest (ex.: testes ou desenvolvimento sem collectstatic) o
+    {% static %} devolve o nome original em vez de lançar erro.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_files = {}
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options,
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                processed_files[name] = hashed_name
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+
+        for name, hashed_name in processed_files.items():
+            for path in {name, hashed_name}:
+                if Path(path).suffix.lower() in COMPRESSIBLE_EXTENSIONS:
+                    compress_file(self.path(path))
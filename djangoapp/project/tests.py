@@ -0,0 +1,419 @@
+import gzip
+import shutil
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from unittest import mock
+
+from axes.models import AccessAttempt
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cache import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.templatetags.static import static
+from django.urls import reverse
+
+from blog.models import Post
+from project.cache import EPOCH_KEY, TieredCache
+from project.compression import CompressionMiddleware, accepted_encoding
+from project.files import parse_range
+from project import metrics
+from project.metrics import flush_stats, get_view_stats, reset_view_stats
+from project.db import get_connection_stats, reset_connection_stats
+from project.routers import (
+    STICKY_COOKIE, ReplicaMiddleware, ReplicaRouter, request_routing,
+)
+from site_setup.snapshot import invalidate_site_setup
+
+
+class ConnectionStatsTests(TestCase):
+    def setUp(self):
+        reset_connection_stats()
+        self.addCleanup(reset_connection_stats)
+
+    def test_requests_reuse_open_connection(self):
+        self.client.get('/')
+        self.client.get('/')
+
+        stats = get_connection_stats()['default']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['reused'], 2)  # TestCase mantém a conexão aberta
+        self.assertEqual(stats['reuse_ratio'], 1.0)
+
+    def test_counts_new_connections(self):
+        connection_created.send(sender=connection.__class__, connection=connection)
+
+        self.assertEqual(get_connection_stats()['default']['opened'], 1)
+
+    def test_view_requires_staff(self):
+        response = self.client.get(reverse('db_stats'))
+        self.assertEqual(response.status_code, 302)
+
+        user = User.objects.create_user('admin', password='x', is_staff=True)
+        self.client.force_login(
+            user, backend='django.contrib.auth.backends.ModelBackend',
+        )
+        response = self.client.get(reverse('db_stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('default', response.json()['databases'])
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def test_reads_go_to_replica_only_inside_request_routing(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        with request_routing():
+            self.assertEqual(self.router.db_for_read(Post), 'replica1')
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_reads_after_write_stay_on_primary(self):
+        with request_routing():
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+        with request_routing():
+            self.assertEqual(self.router.db_for_read(Post), 'replica1')
+
+    def test_no_replicas_configured(self):
+        with override_settings(DATABASE_REPLICAS=[]), request_routing():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def call_middleware(self, request):
+        used = []
+
+        def view(request):
+            used.append(self.router.db_for_read(Post))
+            if request.method == 'POST':
+                self.router.db_for_write(Post)
+            return HttpResponse()
+
+        return ReplicaMiddleware(view)(request), used[0]
+
+    def test_middleware_routes_public_gets_to_replica(self):
+        response, using = self.call_middleware(self.factory.get('/'))
+        self.assertEqual(using, 'replica1')
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+        _, using = self.call_middleware(self.factory.get('/admin/'))
+        self.assertEqual(using, 'default')
+
+    def test_middleware_sticks_to_primary_after_write(self):
+        response, using = self.call_middleware(self.factory.post('/admin/'))
+        self.assertEqual(using, 'default')
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        _, using = self.call_middleware(request)
+        self.assertEqual(using, 'default')
+
+
+class CompressedManifestStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        with override_settings(STATIC_ROOT=self.static_root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            hashed = static('blog/css/style.css')
+
+        self.assertRegex(hashed, r'^/static/blog/css/style\.[0-9a-f]{12}\.css$')
+        path = Path(self.static_root) / hashed.removeprefix('/static/')
+        self.assertTrue(path.exists())
+        self.assertTrue(path.with_name(path.name + '.gz').exists())
+
+    def test_static_falls_back_to_original_name_without_manifest(self):
+        with override_settings(STATIC_ROOT=self.static_root):
+            self.assertEqual(static('blog/css/style.css'), '/static/blog/css/style.css')
+
+
+class FileServingTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'media' / 'covers').mkdir(parents=True)
+        (self.root / 'static' / 'blog').mkdir(parents=True)
+        (self.root / 'media' / 'covers' / 'capa.txt').write_bytes(b'0123456789')
+        (self.root / 'static' / 'blog' / 'app.0123456789ab.css').write_text('body {}')
+        (self.root / 'static' / 'blog' / 'app.0123456789ab.css.gz').write_bytes(b'gz')
+
+        settings = override_settings(
+            MEDIA_ROOT=self.root / 'media', STATIC_ROOT=self.root / 'static',
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_serves_media_with_validators(self):
+        response = self.client.get('/media/covers/capa.txt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=86400')
+
+        response = self.client.get(
+            '/media/covers/capa.txt', HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get('/media/covers/capa.txt', HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(response['Content-Length'], '4')
+
+        response = self.client.get('/media/covers/capa.txt', HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+
+        response = self.client.get(
+            '/media/covers/capa.txt', HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"antigo"',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=-3', 10), (7, 3))
+        self.assertEqual(parse_range('bytes=8-', 10), (8, 2))
+        self.assertEqual(parse_range('bytes=0-99', 10), (0, 10))
+        self.assertIsNone(parse_range('bytes=0-1,4-5', 10))
+        self.assertIs(parse_range('bytes=5-2', 10), False)
+
+    def test_hashed_static_is_immutable_and_precompressed(self):
+        response = self.client.get(
+            '/static/blog/app.0123456789ab.css', HTTP_ACCEPT_ENCODING='gzip, br',
+        )
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(b''.join(response.streaming_content), b'gz')
+
+        response = self.client.get('/static/blog/app.0123456789ab.css')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(response.streaming_content), b'body {}')
+
+    def test_rejects_paths_outside_the_root(self):
+        self.assertEqual(self.client.get('/media/../static/blog/x.css').status_code, 404)
+        self.assertEqual(self.client.get('/media/covers/').status_code, 404)
+        self.assertEqual(self.client.get('/media/nao-existe.jpg').status_code, 404)
+
+    @override_settings(FILE_SERVING='x-accel')
+    def test_x_accel_redirect(self):
+        response = self.client.get('/media/covers/capa.txt')
+        self.assertEqual(response['X-Accel-Redirect'], '/internal/media/covers/capa.txt')
+        self.assertEqual(response.content, b'')
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def respond(self, content, content_type='text/html; charset=utf-8', **headers):
+        response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = '"abc"'
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(self.factory.get('/', **headers))
+
+    def test_negotiates_encoding(self):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0.5, br;q=0, deflate')
+        self.assertEqual(accepted_encoding(request, ('br', 'gzip')), 'gzip')
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='identity')
+        self.assertIsNone(accepted_encoding(request, ('br', 'gzip')))
+
+    def test_compresses_html(self):
+        body = b'<p>post</p>' * 100
+        response = self.respond(body, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), body)
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_skips_small_and_already_compressed_types(self):
+        response = self.respond(b'<p>oi</p>', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+        response = self.respond(b'x' * 1000, 'image/jpeg', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+
+@override_settings(METRICS_SAMPLE_RATE=1.0, METRICS_TOKEN='segredo')
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_site_setup()
+        reset_view_stats()
+        self.addCleanup(reset_view_stats)
+        self.addCleanup(invalidate_site_setup)
+
+    def test_sampled_requests_get_server_timing(self):
+        Post.objManager.create(title='Post', is_published=True)
+        first = self.client.get('/')
+        second = self.client.get('/')
+
+        self.assertRegex(first['Server-Timing'], r'db;desc="[1-9]\d* queries";dur=')
+        self.assertIn('tpl;dur=', first['Server-Timing'])
+        self.assertIn('cache-page;desc="0 hit, 1 miss"', first['Server-Timing'])
+        self.assertIn('cache-page;desc="1 hit, 0 miss"', second['Server-Timing'])
+
+        stats = get_view_stats()['blog:index']
+        self.assertEqual(stats['requests_total'], 2)
+        self.assertEqual(stats['cache_hits_total'], 1)  # Página da 2ª requisição
+        self.assertEqual(stats['cache_misses_total'], 2)  # Página + site_setup da 1ª
+        self.assertGreater(stats['template_seconds_total'], 0)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_only_counted(self):
+        response = self.client.get('/')
+
+        self.assertNotIn('Server-Timing', response)
+        stats = get_view_stats()['blog:index']
+        self.assertEqual(stats['requests_total'], 1)
+        self.assertNotIn('db_queries_total', stats)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/')
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+        response = self.client.get(
+            reverse('metrics'), headers={'Authorization': 'Bearer segredo'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '# TYPE blog_requests_total counter')
+        self.assertContains(response, 'blog_requests_total{view="blog:index"} 1.0')
+        self.assertContains(response, 'db_connections_opened_total')
+
+    def test_totals_are_summed_across_workers(self):
+        self.client.get('/')
+        flush_stats(force=True)
+        self.assertEqual(cache.get('metrics:view:blog:index:requests_total'), 1)
+
+        # Outro worker: mesmo cache compartilhado, contadores próprios na memória
+        with mock.patch.object(metrics, '_db_sent', defaultdict(dict)):
+            metrics._record('blog:index', 0.25, None)
+            flush_stats(force=True)
+
+        stats = get_view_stats()['blog:index']
+        self.assertEqual(stats['requests_total'], 2)
+        self.assertGreaterEqual(stats['request_seconds_total'], 0.25)
+
+
+# Dois "servidores" (node_a e node_b), cada um com o seu L1, na frente do
+# mesmo cache compartilhado (um LocMemCache no lugar do Redis)
+TIERED_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'stand_in': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tiered-tests',
+    },
+    **{
+        node: {
+            'BACKEND': 'project.cache.TieredCache',
+            'OPTIONS': {
+                'SHARED_ALIAS': 'stand_in',
+                'L1_MAX_ENTRIES': 3,
+                'L1_KEY_PREFIXES': ['hot:'],
+                'EPOCH_INTERVAL': 0,
+            },
+        }
+        for node in ('node_a', 'node_b')
+    },
+}
+
+
+@override_settings(CACHES=TIERED_CACHES)
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.shared = caches['stand_in']
+        self.a, self.b = caches['node_a'], caches['node_b']
+        self.a.clear()
+        self.b.clear()
+
+    def test_hot_keys_are_served_from_l1(self):
+        self.a.set('hot:count', 10)
+        self.assertEqual(self.b.get('hot:count'), 10)
+
+        self.shared.delete('hot:count')  # Sem passar pelo TieredCache: o L1 continua
+        self.assertEqual(self.b.get('hot:count'), 10)
+
+        self.a.set('page', 'html')
+        self.shared.delete('page')  # Fora dos prefixos: sempre no compartilhado
+        self.assertIsNone(self.a.get('page'))
+
+    def test_writes_invalidate_the_other_nodes(self):
+        self.a.set('hot:count', 1)
+        self.assertEqual(self.b.get('hot:count'), 1)
+
+        self.a.set('hot:count', 2)
+        self.assertEqual(self.b.get('hot:count'), 2)
+        self.assertEqual(self.b.incr('hot:count'), 3)
+        self.assertEqual(self.a.get('hot:count'), 3)
+        self.b.delete('hot:count')
+        self.assertIsNone(self.a.get('hot:count'))
+
+    def test_filling_a_miss_keeps_the_other_l1s(self):
+        self.a.set('hot:1', 1)
+        self.assertEqual(self.b.get('hot:1'), 1)
+        self.shared.delete('hot:1')  # Sem passar pelo TieredCache: só o L1 ainda tem o valor
+
+        epoch = self.shared.get(EPOCH_KEY)
+        self.a.set('hot:2', 2)  # Chave nova (ex.: {% cache %} numa falta)
+        self.a.set_many({'hot:3': 3, 'page': 'html'})
+        self.assertEqual(self.shared.get(EPOCH_KEY), epoch)
+        self.assertEqual(self.b.get('hot:1'), 1)
+
+        self.a.set('hot:2', 20)  # Sobrescrita: os outros L1 são descartados
+        self.assertNotEqual(self.shared.get(EPOCH_KEY), epoch)
+        self.assertIsNone(self.b.get('hot:1'))
+
+    def test_l1_is_bounded(self):
+        self.a.set_many({f'hot:{number}': number for number in range(5)})
+        self.assertEqual(len(self.a._l1), 3)
+        self.assertEqual(self.a.get_many(['hot:0', 'hot:4']), {'hot:0': 0, 'hot:4': 4})
+
+    def test_epoch_is_checked_at_most_once_per_interval(self):
+        node = TieredCache('', {'OPTIONS': {
+            'SHARED_ALIAS': 'stand_in', 'EPOCH_INTERVAL': 60,
+        }})
+        self.a.set('hot:x', 1)
+        self.assertEqual(node.get('hot:x'), 1)
+        self.a.set('hot:x', 2)
+        self.assertEqual(node.get('hot:x'), 1)  # Ainda dentro do intervalo
+
+        node._epoch_checked = 0
+        self.assertEqual(node.get('hot:x'), 2)
+
+
+class AuthCacheTests(TestCase):
+    def setUp(self):
+        caches['auth'].clear()
+        self.user = User.objects.create_user('admin', password='senha-certa', is_staff=True)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+    def test_sessions_live_only_in_the_auth_cache(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+
+        session_key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.assertFalse(Session.objects.exists())
+        with self.assertNumQueries(0):  # Lida só do cache 'auth'
+            session = SessionStore(session_key).load()
+        self.assertEqual(session['_auth_user_id'], str(self.user.pk))
+
+    @override_settings(
+        AXES_HANDLER='axes.handlers.cache.AxesCacheHandler', AXES_FAILURE_LIMIT=2,
+    )
+    def test_failed_logins_are_counted_in_the_cache(self):
+        url = reverse('admin:login')
+        data = {'username': 'admin', 'password': 'errada'}
+        for _ in range(2):
+            self.client.post(url, data)
+
+        self.assertFalse(AccessAttempt.objects.exists())
+        response = self.client.post(url, {**data, 'password': 'senha-certa'})
+        self.assertEqual(response.status_code, 429)  # Bloqueado pelo axes
@@ -15,19 +15,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
+from project.db import connection_stats_view
+from project.metrics import metrics_view
+
 urlpatterns = [
     path('', include('blog.urls')),
     path('summernote/', include('django_summernote.urls')),
+    path('admin/db-stats/', connection_stats_view, name='db_stats'),
+    path('metrics', metrics_view, name='metrics'),
     path('admin/', admin.site.urls),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT
-    )
\ No newline at end of file
+# /media/ e /static/ são servidos pelo project.files.FileServingMiddleware
\ No newline at end of file
@@ -1,4 +1,4 @@
-from site_setup.models import SiteSetup
+from site_setup.snapshot import get_site_setup
 
 def context_processor_example(request):
     return {
@@ -6,7 +6,8 @@ def context_processor_example(request):
     }
 
 def site_setup(request):
-    setup = SiteSetup.objects.order_by('-id').first()
+    # Snapshot em cache (imutável) com os dados do setup e os links do menu
+    setup = get_site_setup()
     return {
         'site_setup': setup,
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from site_setup.models import MenuLink, SiteSetup
+from site_setup.snapshot import invalidate_site_setup
+
+
+# Qualquer alteração no SiteSetup ou nos links do menu descarta o snapshot em cache
+@receiver(post_save, sender=SiteSetup)
+@receiver(post_delete, sender=SiteSetup)
+@receiver(post_save, sender=MenuLink)
+@receiver(post_delete, sender=MenuLink)
+def site_setup_changed(sender, **kwargs):
+    invalidate_site_setup()
@@ -0,0 +1,108 @@
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from project.metrics import cache_accessed
+from site_setup.models import SiteSetup
+
+# Valor padrão (em segundos) caso SITE_SETUP_CACHE_TTL não esteja no settings
+DEFAULT_TTL = 60
+
+
+@dataclass(frozen=True)
+class MenuLinkSnapshot:
+    text: str
+    url_or_path: str
+    new_tab: bool
+
+
+# Cópia imutável do SiteSetup e dos seus links de menu.
+# É o que os templates recebem como `site_setup`, sem precisar ir ao banco.
+@dataclass(frozen=True)
+class SiteSetupSnapshot:
+    title: str
+    description: str
+    show_header: bool
+    show_search: bool
+    show_menu: bool
+    show_description: bool
+    show_pagination: bool
+    show_footer: bool
+    favicon_url: str
+    menu_links: tuple[MenuLinkSnapshot, ...]
+
+    @classmethod
+    def from_instance(cls, setup: SiteSetup) -> 'SiteSetupSnapshot':
+        menu_links = tuple(
+            MenuLinkSnapshot(
+                text=link.text,
+                url_or_path=link.url_or_path,
+                new_tab=link.new_tab,
+            )
+            for link in setup.menulink_set.order_by('pk')
+        )
+        return cls(
+            title=setup.title,
+            description=setup.description,
+            show_header=setup.show_header,
+            show_search=setup.show_search,
+            show_menu=setup.show_menu,
+            show_description=setup.show_description,
+            show_pagination=setup.show_pagination,
+            show_footer=setup.show_footer,
+            favicon_url=setup.favicon.url if setup.favicon else '',
+            menu_links=menu_links,
+        )
+
+
+# Versão do setup no cache compartilhado (project.cache.TieredCache): o save
+# em um servidor troca a versão e os outros recarregam sem esperar o TTL.
+# A leitura vem do L1, sem ida à rede na maioria das requisições.
+VERSION_KEY = 'site_setup:version'
+
+_lock = threading.Lock()
+# (snapshot, expira_em, versão) trocado de uma vez só, para leitura sem lock
+_cached: tuple = (None, 0.0, None)
+
+
+def _load_snapshot():
+    setup = SiteSetup.objects.order_by('-id').first()
+    if setup is None:
+        return None
+    return SiteSetupSnapshot.from_instance(setup)
+
+
+def get_site_setup():
+    # Cache em memória do processo, com TTL. Os signals limpam o cache quando
+    # o admin salva e trocam a VERSION_KEY, que os outros workers conferem.
+    global _cached
+
+    version = cache.get(VERSION_KEY)
+    snapshot, expires_at, cached_version = _cached
+    if expires_at > time.monotonic() and cached_version == version:
+        cache_accessed.send(sender=SiteSetup, name='site_setup', hit=True)
+        return snapshot
+
+    cache_accessed.send(sender=SiteSetup, name='site_setup', hit=False)
+    with _lock:
+        snapshot, expires_at, cached_version = _cached
+        if expires_at > time.monotonic() and cached_version == version:  # Outra thread já recarregou
+            return snapshot
+
+        if version is None:
+            cache.add(VERSION_KEY, time.time_ns(), None)
+            version = cache.get(VERSION_KEY)
+        snapshot = _load_snapshot()
+        ttl = getattr(settings, 'SITE_SETUP_CACHE_TTL', DEFAULT_TTL)
+        _cached = (snapshot, time.monotonic() + ttl, version)
+        return snapshot
+
+
+def invalidate_site_setup():
+    global _cached
+    with _lock:
+        _cached = (None, 0.0, None)
+    cache.set(VERSION_KEY, time.time_ns(), None)  # Os outros processos recarregam
@@ -1,3 +1,68 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from site_setup.models import MenuLink, SiteSetup
+from site_setup.snapshot import VERSION_KEY, get_site_setup, invalidate_site_setup
+
+
+class SiteSetupSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_site_setup()
+        self.addCleanup(invalidate_site_setup)
+        self.setup = SiteSetup.objects.create(
+            title='Blog', description='Descrição',
+        )
+        MenuLink.objects.create(
+            text='Home', url_or_path='/', site_setup=self.setup,
+        )
+
+    def test_snapshot_is_cached(self):
+        with self.assertNumQueries(2):  # setup + links do menu
+            snapshot = get_site_setup()
+        with self.assertNumQueries(0):
+            self.assertIs(get_site_setup(), snapshot)
+
+        self.assertEqual(snapshot.title, 'Blog')
+        self.assertEqual(
+            [link.text for link in snapshot.menu_links], ['Home'],
+        )
+
+    def test_save_invalidates_snapshot(self):
+        get_site_setup()
+        self.setup.title = 'Novo título'
+        self.setup.save()
+        self.assertEqual(get_site_setup().title, 'Novo título')
+
+    def test_menu_link_change_invalidates_snapshot(self):
+        get_site_setup()
+        MenuLink.objects.create(
+            text='Sobre', url_or_path='/sobre/', site_setup=self.setup,
+        )
+        self.assertEqual(len(get_site_setup().menu_links), 2)
+
+        MenuLink.objects.filter(text='Home').get().delete()
+        self.assertEqual(
+            [link.text for link in get_site_setup().menu_links], ['Sobre'],
+        )
+
+    def test_version_change_from_another_process_reloads(self):
+        get_site_setup()
+        cache.set(VERSION_KEY, 'outro-servidor', None)  # Save em outro worker/servidor
+        with self.assertNumQueries(2):
+            get_site_setup()
+        with self.assertNumQueries(0):
+            get_site_setup()
+
+    @override_settings(SITE_SETUP_CACHE_TTL=0)
+    def test_expired_snapshot_is_reloaded(self):
+        get_site_setup()
+        with self.assertNumQueries(2):
+            get_site_setup()
+
+    @override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)  # Sem o cache de páginas do blog
+    def test_page_renders_without_site_setup_queries(self):
+        self.client.get('/')
+        with self.assertNumQueries(0):  # Sem posts, e o total da listagem fica em cache
+            response = self.client.get('/')
+        self.assertContains(response, 'Home')
@@ -0,0 +1,252 @@
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.text import slugify
+
+from utils.images import DERIVATIVE_WIDTHS, derivative_name, original_format
+
+# O HTML vem do summernote (admin). Guardamos só o que o editor produz e
+# descartamos o resto (scripts, handlers on*, javascript: etc.).
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'code', 'div', 'em', 'font', 'h1', 'h2',
+    'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'iframe', 'img', 'li', 'ol', 'p', 'pre',
+    's', 'span', 'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td',
+    'tfoot', 'th', 'thead', 'tr', 'u', 'ul',
+}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Conteúdo inteiro removido, não só a tag
+DROPPED_TAGS = {'script', 'style', 'object', 'embed', 'template', 'noscript'}
+
+GLOBAL_ATTRS = {'class', 'style'}
+ALLOWED_ATTRS = {
+    'a': {'href', 'title', 'target'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'iframe': {'src', 'width', 'height', 'allowfullscreen', 'frameborder'},
+    'font': {'color', 'face', 'size'},
+    'ol': {'start'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+URL_ATTRS = {'href', 'src'}
+URL_SCHEMES = {'', 'http', 'https', 'mailto'}
+# Vídeos que o summernote incorpora
+IFRAME_HOSTS = {
+    'www.youtube.com', 'youtube.com', 'www.youtube-nocookie.com',
+    'player.vimeo.com',
+}
+UNSAFE_STYLE = re.compile(r'expression|javascript:|url\s*\(|@import|behavior', re.I)
+
+# Fechamento implícito (como o navegador faz): abrir a tag da esquerda fecha
+# a do topo da pilha se ela estiver no conjunto da direita
+BLOCK_TAGS = {
+    'blockquote', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'ol', 'p',
+    'pre', 'table', 'ul',
+}
+IMPLICIT_CLOSE = {
+    'li': {'li'},
+    'td': {'td', 'th'},
+    'th': {'td', 'th'},
+    'tr': {'td', 'th', 'tr'},
+    **{tag: {'p'} for tag in BLOCK_TAGS},
+}
+
+# Títulos que ganham âncora (id) para links diretos
+ANCHOR_TAGS = {'h2', 'h3'}
+
+# Largura máxima do conteúdo do post (mesma do post.html)
+CONTENT_SIZES = '(max-width: 900px) 100vw, 900px'
+
+
+def _safe_url(value, tag):
+    parts = urlsplit(value.strip())
+    if parts.scheme.lower() not in URL_SCHEMES:
+        return None
+    if tag == 'iframe' and (parts.scheme != 'https' or parts.hostname not in IFRAME_HOSTS):
+        return None
+    return value.strip()
+
+
+def _media_name(src):
+    # /media/posts/2024/01/x.jpg -> posts/2024/01/x.jpg (só arquivos locais)
+    media_url = settings.MEDIA_URL
+    if not media_url or not src.startswith(media_url):
+        return None
+    return unquote(src[len(media_url):])
+
+
+class ContentRenderer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.open_tags = []
+        self.dropping = 0
+        self.anchors = set()
+        self.heading = None  # (posição no out, tag, atributos, texto) do título aberto
+
+    # Entrada/saída
+    def render(self, html):
+        self.feed(html or '')
+        self.close()
+        while self.open_tags:
+            self._close(self.open_tags[-1])
+        return ''.join(self.out)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+
+        attrs = self.clean_attrs(tag, attrs)
+        if attrs is None:
+            return
+        while self.open_tags and self.open_tags[-1] in IMPLICIT_CLOSE.get(tag, ()):
+            self._close(self.open_tags[-1])
+        if tag == 'img':
+            attrs = self.image_attrs(attrs)
+
+        if tag in ANCHOR_TAGS and 'id' not in attrs and self.heading is None:
+            self.heading = (len(self.out), tag, attrs, [])
+            self.out.append('')  # Preenchido no fechamento, quando o texto é conhecido
+        else:
+            self.out.append(self.start_tag(tag, attrs))
+
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self._close(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        while self.open_tags:
+            if self._close(self.open_tags[-1]) == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        if self.heading is not None:
+            self.heading[3].append(data)
+        self.out.append(escape(data, quote=False))
+
+    # Tags e atributos
+    def _close(self, tag):
+        self.open_tags.pop()
+        if self.heading is not None and self.heading[1] == tag:
+            index, _, attrs, text = self.heading
+            attrs['id'] = self.anchor(''.join(text))
+            self.out[index] = self.start_tag(tag, attrs)
+            self.heading = None
+        self.out.append(f'</{tag}>')
+        return tag
+
+    def start_tag(self, tag, attrs):
+        rendered = ''.join(
+            f' {name}' if value is None else f' {name}="{escape(value)}"'
+            for name, value in attrs.items()
+        )
+        return f'<{tag}{rendered}>'
+
+    def clean_attrs(self, tag, attrs):
+        allowed = GLOBAL_ATTRS | ALLOWED_ATTRS.get(tag, set())
+        cleaned = {}
+        for name, value in attrs:
+            name = name.lower()
+            if name not in allowed:
+                continue
+            if name in URL_ATTRS:
+                value = _safe_url(value or '', tag)
+                if value is None:
+                    continue
+            if name == 'style' and value and UNSAFE_STYLE.search(value):
+                continue
+            cleaned[name] = value
+
+        if tag in ('img', 'iframe') and 'src' not in cleaned:
+            return None  # Sem src válido a tag não tem utilidade
+        if cleaned.get('target') == '_blank':
+            cleaned['rel'] = 'noopener noreferrer'
+        return cleaned
+
+    def image_attrs(self, attrs):
+        attrs.setdefault('loading', 'lazy')
+        attrs.setdefault('decoding', 'async')
+
+        # Imagens enviadas pelo summernote: usa as versões menores do worker de jobs
+        name = _media_name(attrs['src'])
+        if name is None:
+            return attrs
+        image_format = original_format(name)
+        widths = [
+            width for width in DERIVATIVE_WIDTHS
+            if default_storage.exists(derivative_name(name, width, image_format))
+        ]
+        if widths:
+            attrs['srcset'] = ', '.join(
+                f'{default_storage.url(derivative_name(name, width, image_format))} {width}w'
+                for width in widths
+            )
+            attrs['sizes'] = CONTENT_SIZES
+        return attrs
+
+    def anchor(self, text):
+        base = slugify(text) or 'secao'
+        anchor, number = base, 2
+        while anchor in self.anchors:
+            anchor, number = f'{base}-{number}', number + 1
+        self.anchors.add(anchor)
+        return anchor
+
+
+def render_html(html):
+    """
+    HTML do editor -> HTML pronto para o template: sanitizado, com
+    loading="lazy" e srcset nas imagens e âncoras nos títulos (h2/h3).
+    """
+    return ContentRenderer().render(html)
+
+
+def render_rows(model, fields, queryset=None, batch_size=500):
+    """
+    Regera em lote as colunas *_html de um model, sem chamar save() nem signals.
+    fields: {'content': 'content_html', ...}. Retorna quantas linhas mudaram.
+    Usado pelo comando render_content, pela migration 0014 e pelo worker de imagens.
+    """
+    if queryset is None:
+        queryset = model._base_manager.all()
+    sources, targets = list(fields), list(fields.values())
+    rows = queryset.order_by('pk').values_list('pk', *sources, *targets)
+
+    # Lotes por faixa de pk (seek): nenhum cursor fica aberto durante o UPDATE
+    changed, last_pk = 0, None
+    while True:
+        page = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+        page = list(page[:batch_size])
+        if not page:
+            return changed
+
+        batch = []
+        for pk, *values in page:
+            old = dict(zip(targets, values[len(sources):]))
+            new = {
+                target: render_html(value)
+                for target, value in zip(targets, values[:len(sources)])
+            }
+            if new != old:
+                batch.append(model(pk=pk, **new))
+        if batch:
+            model._base_manager.bulk_update(batch, targets)
+            changed += len(batch)
+        last_pk = page[-1][0]
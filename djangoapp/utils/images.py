@@ -1,11 +1,22 @@
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 
 from django.conf import settings
 from PIL import Image
 
+try:
+    import pillow_avif  # noqa: F401 (plugin opcional que adiciona AVIF ao Pillow)
+except ImportError:
+    pass
+
 
 def resize_image(image_django, new_width=800, optimize=True, quality=60):
-    image_path = Path(settings.MEDIA_ROOT / image_django.name).resolve()
+    return resize_image_file(image_django.name, new_width, optimize, quality)
+
+
+# Mesma lógica do resize_image, mas recebe o nome do arquivo dentro do MEDIA_ROOT.
+# É o que o worker de jobs (jobs.ImageJob) usa fora da requisição.
+def resize_image_file(name, new_width=800, optimize=True, quality=60):
+    image_path = Path(settings.MEDIA_ROOT / name).resolve()
     image_pillow = Image.open(image_path)
     original_width, original_height = image_pillow.size
 
@@ -23,4 +34,65 @@ def resize_image(image_django, new_width=800, optimize=True, quality=60):
         quality=quality,
     )
 
-    return new_image
\ No newline at end of file
+    return new_image
+
+
+# Larguras geradas para o srcset das capas e anexos
+DERIVATIVE_WIDTHS = (320, 640, 900)
+
+
+def derivative_formats():
+    # Formatos modernos que este Pillow consegue salvar, do melhor para o pior
+    Image.init()  # Carrega os plugins de formato do Pillow
+    formats = []
+    if 'AVIF' in Image.SAVE:
+        formats.append('avif')
+    if 'WEBP' in Image.SAVE:
+        formats.append('webp')
+    return formats
+
+
+def original_format(name):
+    return PurePosixPath(name).suffix.lstrip('.').lower()
+
+
+# posts/2023/12/capa.jpg -> posts/2023/12/capa-320w.webp
+def derivative_name(name, width, image_format):
+    stem = PurePosixPath(name).with_suffix('')
+    return f'{stem}-{width}w.{image_format}'
+
+
+def make_derivatives(name, widths=DERIVATIVE_WIDTHS, quality=60):
+    # Gera uma cópia por largura e formato ao lado do arquivo original.
+    # Nunca aumenta a imagem: larguras maiores que o original ficam no tamanho original.
+    image_path = Path(settings.MEDIA_ROOT / name).resolve()
+    formats = derivative_formats() + [original_format(name)]
+    created = []
+
+    with Image.open(image_path) as image_pillow:
+        image_pillow.load()
+        original_width, original_height = image_pillow.size
+
+        for width in widths:
+            new_width = min(width, original_width)
+            new_height = round(new_width * original_height / original_width)
+            resized = image_pillow
+            if new_width != original_width:
+                resized = image_pillow.resize(
+                    (new_width, new_height), Image.LANCZOS,
+                )
+
+            for image_format in formats:
+                new_name = derivative_name(name, width, image_format)
+                _save_derivative(
+                    resized, settings.MEDIA_ROOT / new_name, image_format, quality,
+                )
+                created.append(new_name)
+
+    return created
+
+
+def _save_derivative(image_pillow, path, image_format, quality):
+    if image_format in ('jpg', 'jpeg') and image_pillow.mode not in ('RGB', 'L'):
+        image_pillow = image_pillow.convert('RGB')
+    image_pillow.save(path, optimize=True, quality=quality)
@@ -1,14 +1,129 @@
+import hashlib
 import string
-from random import SystemRandom
+from django.db import IntegrityError, connections, router, transaction
 from django.utils.text import slugify
 
-# Gerando letra aleatórias para utilizar no SLUG
-def random_letters(k=5):
-    return ''.join(SystemRandom().choices(
-        string.ascii_letters + string.digits,
-        k=k
-    ))
+# Sufixo do SLUG: letras/números derivados do texto (determinístico), não aleatórios.
+# O mesmo título sempre gera a mesma sequência de candidatos, então a escolha
+# depende só do que já existe no banco.
+SLUG_ALPHABET = string.ascii_lowercase + string.digits
 
-# Gerando um texto recebido com letras aleatorias formando uma URL
-def slugify_new(text, k=5):
-    return slugify(text) + random_letters(k)
\ No newline at end of file
+# Primeira rodada: 1 candidato por texto (quase sempre livre).
+# Rodadas seguintes (colisão): vários candidatos por texto na mesma query.
+RETRY_CANDIDATES = 8
+
+# Quantas vezes o save tenta de novo se outro processo gravou o mesmo slug
+SAVE_RETRIES = 3
+
+
+def slug_suffix(base, attempt, k=5):
+    digest = hashlib.blake2b(f'{base}:{attempt}'.encode(), digest_size=32).digest()
+    return ''.join(SLUG_ALPHABET[byte % len(SLUG_ALPHABET)] for byte in digest[:k])
+
+
+def slug_candidate(text, attempt, k=5, max_length=None):
+    base = slugify(text)
+    if max_length:
+        base = base[:max_length - k].rstrip('-')
+    return base + slug_suffix(base, attempt, k)
+
+
+def _attempts(round_number):
+    if round_number == 0:
+        return range(1)
+    start = 1 + (round_number - 1) * RETRY_CANDIDATES
+    return range(start, start + RETRY_CANDIDATES)
+
+
+def allocate_slugs(model, texts, k=5, field='slug', using=None, exclude_pk=None, reserved=()):
+    """
+    Um slug único para cada texto, checado contra o índice único em lote:
+    uma query por rodada (dividida só pelo limite de parâmetros do banco),
+    não uma por slug. Slugs repetidos dentro do próprio lote também são evitados.
+    reserved: slugs que já estão em uso no lote mas ainda não foram gravados.
+    """
+    using = using or router.db_for_write(model)
+    max_length = model._meta.get_field(field).max_length
+    queryset = model._base_manager.using(using)
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    chunk_size = connections[using].features.max_query_params or 10_000
+
+    slugs = [None] * len(texts)
+    taken = set(reserved)
+    pending = list(range(len(texts)))
+    round_number = 0
+    while pending:
+        candidates = {
+            index: [
+                slug_candidate(texts[index], attempt, k, max_length)
+                for attempt in _attempts(round_number)
+            ]
+            for index in pending
+        }
+        lookup = sorted({slug for slugs_ in candidates.values() for slug in slugs_} - taken)
+        for start in range(0, len(lookup), chunk_size):
+            taken.update(queryset.filter(
+                **{f'{field}__in': lookup[start:start + chunk_size]}
+            ).values_list(field, flat=True))
+
+        unresolved = []
+        for index in pending:
+            free = next((slug for slug in candidates[index] if slug not in taken), None)
+            if free is None:
+                unresolved.append(index)
+                continue
+            slugs[index] = free
+            taken.add(free)
+        pending = unresolved
+        round_number += 1
+    return slugs
+
+
+def unique_slug(instance, text, k=5, field='slug', using=None):
+    return allocate_slugs(
+        type(instance), [text], k, field, using=using, exclude_pk=instance.pk,
+    )[0]
+
+
+def assign_slugs(instances, source, k=5, field='slug', using=None):
+    """
+    Preenche o slug dos objetos que ainda não têm, para bulk_create/importações.
+    source: campo com o texto (ex.: 'title'). Retorna os próprios objetos.
+    """
+    instances = list(instances)
+    if not instances:
+        return instances
+    pending = [obj for obj in instances if not getattr(obj, field)]
+    reserved = {getattr(obj, field) for obj in instances if getattr(obj, field)}
+    slugs = allocate_slugs(
+        type(instances[0]), [getattr(obj, source) for obj in pending], k, field,
+        using=using, reserved=reserved,
+    )
+    for obj, slug in zip(pending, slugs):
+        setattr(obj, field, slug)
+    return instances
+
+
+def save_with_unique_slug(instance, text, k, save, field='slug', using=None):
+    """
+    Gera o slug (se vazio) e chama save(). Se outro processo gravar o mesmo
+    slug entre a checagem e o INSERT, o índice único recusa e tentamos o
+    próximo candidato livre.
+    """
+    if getattr(instance, field):
+        return save()
+
+    using = using or router.db_for_write(type(instance), instance=instance)
+    for retry in range(SAVE_RETRIES):
+        setattr(instance, field, unique_slug(instance, text, k, field, using))
+        try:
+            with transaction.atomic(using=using):
+                return save()
+        except IntegrityError:
+            conflict = type(instance)._base_manager.using(using).filter(
+                **{field: getattr(instance, field)},
+            ).exclude(pk=instance.pk).exists()
+            if not conflict or retry == SAVE_RETRIES - 1:
+                setattr(instance, field, None if instance._meta.get_field(field).null else '')
+                raise
@@ -0,0 +1,11 @@
+#!/bin/sh
+
+# O shell irá encerrar a execução do script quando um comando falhar
+set -e
+
+# Confere as queries de cada rota contra blog/benchmark_baseline.json
+# (versionado). Se uma mudança reduzir as queries de propósito, atualize o
+# baseline com "python manage.py benchmark --save-baseline" e faça commit.
+echo 'Executando benchmark.sh'
+python manage.py seed_blog
+python manage.py benchmark --check "$@"
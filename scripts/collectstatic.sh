@@ -1,2 +1,4 @@
 #!/bin/sh
-python manage.py collectstatic --noinput
\ No newline at end of file
+# Sem internet o bundle não é gerado e o post.html usa o CDN do CodeMirror
+python manage.py build_codemirror || echo '🟡 CodeMirror sem bundle, usando o CDN'
+python manage.py collectstatic --noinput
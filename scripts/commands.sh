@@ -6,4 +6,5 @@ set -e
 wait_psql.sh
 collectstatic.sh
 migrate.sh
+imageworker.sh &  # Worker da fila de imagens em segundo plano
 runserver.sh
\ No newline at end of file
@@ -0,0 +1,3 @@
+#!/bin/sh
+echo 'Executando imageworker.sh'
+python manage.py process_image_jobs
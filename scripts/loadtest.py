@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+Teste de carga simples (só biblioteca padrão) para o servidor de produção.
+
+Contra um servidor já rodando:
+
+    python loadtest.py --url http://127.0.0.1:8000/ --concurrency 16
+
+Medindo a escala por número de workers (sobe um gunicorn para cada valor,
+precisa rodar dentro de djangoapp/ ou informar --app-dir):
+
+    python loadtest.py --workers 1,2,4,8 --path / --path /page/2/
+
+Cada cliente roda em um processo separado com conexão keep-alive, para que
+o próprio teste não fique limitado pelo GIL.
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+def client(args):
+    url, paths, duration = args
+    parts = urlsplit(url)
+    connection_class = (
+        http.client.HTTPSConnection if parts.scheme == 'https'
+        else http.client.HTTPConnection
+    )
+    connection = connection_class(parts.netloc, timeout=30)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    index = 0
+
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers={'Host': parts.hostname})
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+
+    connection.close()
+    return latencies, errors
+
+
+def run(url, paths, concurrency, duration):
+    jobs = [(url, paths, duration)] * concurrency
+    start = time.perf_counter()
+    with multiprocessing.Pool(concurrency) as pool:
+        results = pool.map(client, jobs)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(lat for result in results for lat in result[0])
+    errors = sum(result[1] for result in results)
+    if not latencies:
+        return {'requests': 0, 'errors': errors, 'rps': 0.0}
+
+    def percentile(value):
+        return latencies[min(int(len(latencies) * value), len(latencies) - 1)] * 1000
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+    }
+
+
+def print_result(label, result):
+    print(
+        f'{label:>10}  {result["rps"]:9.1f} req/s  '
+        f'{result["requests"]:7d} ok  {result["errors"]:5d} erros',
+        end='',
+    )
+    if result['requests']:
+        print(
+            f'  p50 {result["p50_ms"]:.1f} ms  p95 {result["p95_ms"]:.1f} ms'
+            f'  p99 {result["p99_ms"]:.1f} ms',
+        )
+    else:
+        print()
+
+
+def wait_ready(url, timeout=30):
+    parts = urlsplit(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(parts.netloc, timeout=2)
+            connection.request('GET', '/')
+            connection.getresponse().read()
+            connection.close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_gunicorn(workers, port, app_dir, app):
+    env = dict(
+        os.environ,
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        GUNICORN_ACCESSLOG='',  # Log de acesso distorce a medição
+    )
+    return subprocess.Popen(
+        ['gunicorn', '-c', 'project/gunicorn.conf.py', app],
+        cwd=app_dir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def scale(options):
+    url = f'http://127.0.0.1:{options.port}'
+    baseline = None
+    print(f'{multiprocessing.cpu_count()} núcleos, {options.concurrency} clientes')
+
+    for workers in options.workers:
+        server = start_gunicorn(workers, options.port, options.app_dir, options.app)
+        try:
+            if not wait_ready(url):
+                sys.exit(f'gunicorn com {workers} worker(s) não respondeu')
+            run(url, options.paths, options.concurrency, 1)  # Aquecimento
+            result = run(url, options.paths, options.concurrency, options.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+        baseline = baseline or result['rps'] or None
+        print_result(f'{workers} worker', result)
+        if baseline:
+            speedup = result['rps'] / baseline
+            print(f'{"":>10}  {speedup:.2f}x ({speedup / workers:.0%} por worker)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument(
+        '--path', dest='paths', action='append',
+        help='Caminho requisitado (pode repetir). Padrão: /',
+    )
+    parser.add_argument('--concurrency', type=int, default=multiprocessing.cpu_count() * 4)
+    parser.add_argument('--duration', type=float, default=10, help='Segundos por rodada')
+    parser.add_argument(
+        '--workers', type=lambda value: [int(v) for v in value.split(',')],
+        help='Lista de workers (ex.: 1,2,4) para medir a escala com o gunicorn',
+    )
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument(
+        '--app-dir', default=str(Path(__file__).resolve().parent.parent / 'djangoapp'),
+    )
+    parser.add_argument('--app', default='project.wsgi:application')
+    options = parser.parse_args()
+    options.paths = options.paths or ['/']
+
+    if options.workers:
+        scale(options)
+    else:
+        print_result(
+            'total', run(options.url, options.paths, options.concurrency, options.duration),
+        )
+
+
+if __name__ == '__main__':
+    main()
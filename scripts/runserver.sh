@@ -1,2 +1,13 @@
 #!/bin/sh
-python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+
+# DEBUG=1 usa o runserver (desenvolvimento). Em produção sobe o gunicorn
+# com vários workers, configurado em project/gunicorn.conf.py.
+if [ "${DEBUG:-0}" = "1" ]; then
+  exec python manage.py runserver 0.0.0.0:8000
+fi
+
+if [ "${SERVER_INTERFACE:-wsgi}" = "asgi" ]; then
+  exec gunicorn -c project/gunicorn.conf.py project.asgi:application
+fi
+
+exec gunicorn -c project/gunicorn.conf.py project.wsgi:application